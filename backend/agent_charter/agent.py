@@ -451,7 +451,9 @@ async def chart_maker_agent(event):
                         return json.dumps({"error": "Failed to save charts to database"})
                 else:
                     logger.warning("Charter Agent: No charts found in result - charts array was empty")
-                    logger.debug(f"Charter Agent: Full result structure: {json.dumps(chart_json, indent=2)[:500]}...")
+                    # Only pretty-print the (possibly large) result when debug logging is on
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(f"Charter Agent: Full result structure: {json.dumps(chart_json, indent=2)[:500]}...")
                     return json.dumps({"error": "No charts generated"})
             else:
                 logger.error(f"Charter Agent: Invalid result format or error result detected")
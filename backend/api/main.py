@@ -25,6 +25,7 @@ from src.schemas import (
     UserCreate,
     AccountCreate,
     PositionCreate,
+    InstrumentCreate,
     JobCreate, JobUpdate,
     JobType, JobStatus
 )
@@ -93,6 +94,8 @@ async def general_exception_handler(request: Request, exc: Exception):
 
 # Initialize services
 db = Database()
+# Resolve credentials and wake the cluster during Lambda init; never raises
+db.client.warm()
 
 # SQS client for job queueing
 sqs_client = boto3.client('sqs', region_name=os.getenv('DEFAULT_AWS_REGION', 'us-east-1'))
@@ -176,11 +179,8 @@ async def get_or_create_user(
             'region_targets': {"north_america": 50, "international": 50}
         }
 
-        # Insert directly with all data
-        created_clerk_id = db.users.db.insert('users', user_data, returning='clerk_user_id')
-
-        # Fetch the created user
-        created_user = db.users.find_by_clerk_id(clerk_user_id)
+        # Insert directly with all data, getting the created row back in the same call
+        created_user = db.users.db.insert('users', user_data, returning='*')
         logger.info(f"Created new user: {clerk_user_id}")
 
         return UserResponse(user=created_user, created=True)
@@ -194,10 +194,8 @@ async def update_user(user_update: UserUpdate, clerk_user_id: str = Depends(get_
     """Update user settings"""
 
     try:
-        # Get user
-        user = db.users.find_by_clerk_id(clerk_user_id)
-
-        if not user:
+        # Check user exists
+        if not db.users.exists(clerk_user_id):
             raise HTTPException(status_code=404, detail="User not found")
 
         # Update user - users table uses clerk_user_id as primary key
@@ -238,20 +236,17 @@ async def create_account(account: AccountCreate, clerk_user_id: str = Depends(ge
 
     try:
         # Verify user exists
-        user = db.users.find_by_clerk_id(clerk_user_id)
-        if not user:
+        if not db.users.exists(clerk_user_id):
             raise HTTPException(status_code=404, detail="User not found")
 
-        # Create account
-        account_id = db.accounts.create_account(
+        # Create account and return the created row
+        created_account = db.accounts.create_account(
             clerk_user_id=clerk_user_id,
             account_name=account.account_name,
             account_purpose=account.account_purpose,
-            cash_balance=getattr(account, 'cash_balance', Decimal('0'))
+            cash_balance=getattr(account, 'cash_balance', Decimal('0')),
+            returning='*'
         )
-
-        # Return created account
-        created_account = db.accounts.find_by_id(account_id)
         return created_account
 
     except Exception as e:
@@ -332,15 +327,12 @@ async def list_positions(account_id: str, clerk_user_id: str = Depends(get_curre
 
         positions = db.positions.find_by_account(account_id)
 
-        # Format positions with instrument data for frontend
-        formatted_positions = []
-        for pos in positions:
-            # Get full instrument data
-            instrument = db.instruments.find_by_symbol(pos['symbol'])
-            formatted_positions.append({
-                **pos,
-                'instrument': instrument
-            })
+        # Format positions with instrument data for frontend (one lookup for all symbols)
+        instruments = db.instruments.find_by_symbols([pos['symbol'] for pos in positions])
+        formatted_positions = [
+            {**pos, 'instrument': instruments.get(pos['symbol'])}
+            for pos in positions
+        ]
 
         return {"positions": formatted_positions}
 
@@ -369,9 +361,6 @@ async def create_position(position: PositionCreate, clerk_user_id: str = Depends
         if not instrument:
             logger.info(f"Creating new instrument: {position.symbol.upper()}")
             # Create a basic instrument entry with default allocations
-            # Import the schema from database
-            from src.schemas import InstrumentCreate
-
             # Determine type based on common patterns
             symbol_upper = position.symbol.upper()
             if len(symbol_upper) <= 5 and symbol_upper.isalpha():
@@ -494,22 +483,17 @@ async def trigger_analysis(request: AnalyzeRequest, clerk_user_id: str = Depends
     """Trigger portfolio analysis"""
 
     try:
-        # Get user
-        user = db.users.find_by_clerk_id(clerk_user_id)
-
-        if not user:
+        # Check user exists
+        if not db.users.exists(clerk_user_id):
             raise HTTPException(status_code=404, detail="User not found")
 
-        # Create job
+        # Create job (the response only needs its ID, so no follow-up fetch)
         job_id = db.jobs.create_job(
             clerk_user_id=clerk_user_id,
             job_type="portfolio_analysis",
             request_payload=request.model_dump()
         )
 
-        # Get the created job
-        job = db.jobs.find_by_id(job_id)
-
         # Send to SQS
         if SQS_QUEUE_URL:
             message = {
@@ -578,9 +562,8 @@ async def reset_accounts(clerk_user_id: str = Depends(get_current_user_id)):
     """Delete all accounts for the current user"""
 
     try:
-        # Get user
-        user = db.users.find_by_clerk_id(clerk_user_id)
-        if not user:
+        # Check user exists
+        if not db.users.exists(clerk_user_id):
             raise HTTPException(status_code=404, detail="User not found")
 
         # Get all accounts for user
@@ -610,9 +593,8 @@ async def populate_test_data(clerk_user_id: str = Depends(get_current_user_id)):
     """Populate test data for the current user"""
 
     try:
-        # Get user
-        user = db.users.find_by_clerk_id(clerk_user_id)
-        if not user:
+        # Check user exists
+        if not db.users.exists(clerk_user_id):
             raise HTTPException(status_code=404, detail="User not found")
 
         # Define missing instruments that might not be in the database
@@ -661,11 +643,8 @@ async def populate_test_data(clerk_user_id: str = Depends(get_current_user_id)):
 
         # Check and add missing instruments
         for symbol, info in missing_instruments.items():
-            existing = db.instruments.find_by_symbol(symbol)
-            if not existing:
+            if not db.instruments.exists(symbol):
                 try:
-                    from src.schemas import InstrumentCreate
-
                     instrument_data = InstrumentCreate(
                         symbol=symbol,
                         name=info["name"],
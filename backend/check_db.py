@@ -1,3 +1,5 @@
+import json
+
 from database.src import Database
 
 db = Database()
@@ -14,17 +16,17 @@ for inst in instruments:
         print(f"  {symbol}: N/A")
 
 print("\nChecking recent jobs...")
-jobs = db.jobs.find_all()
-print(f"Found {len(jobs)} total jobs")
+# Let Postgres sort and keep the last 5; the window count still gives the total
+recent_jobs = db.query_raw(
+    "SELECT *, COUNT(*) OVER () AS total_jobs FROM jobs ORDER BY created_at DESC LIMIT 5"
+)
+print(f"Found {recent_jobs[0]['total_jobs'] if recent_jobs else 0} total jobs")
 
-# Sort jobs by created_at and show last 5
-sorted_jobs = sorted(jobs, key=lambda x: x['created_at'], reverse=True)[:5]
-for job in sorted_jobs:
+for job in recent_jobs:
     print(f"  Job {job['id'][:8]}...: {job['status']} - {job['created_at']}")
     if job.get('results'):
         print(f"    Has results: Yes (length: {len(str(job['results']))} chars)")
         # Check if it's JSON data
-        import json
         try:
             results = json.loads(job['results']) if isinstance(job['results'], str) else job['results']
             if 'charter' in results:
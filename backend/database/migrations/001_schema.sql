@@ -86,12 +86,25 @@ CREATE TABLE IF NOT EXISTS jobs (
     updated_at TIMESTAMP DEFAULT NOW()
 );
 
--- Create indexes for common queries
-CREATE INDEX IF NOT EXISTS idx_accounts_user ON accounts(clerk_user_id);
-CREATE INDEX IF NOT EXISTS idx_positions_account ON positions(account_id);
-CREATE INDEX IF NOT EXISTS idx_positions_symbol ON positions(symbol);
-CREATE INDEX IF NOT EXISTS idx_jobs_user ON jobs(clerk_user_id);
-CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);
+-- Create indexes for common queries (one round trip for all of them)
+DO $$
+DECLARE
+    idx RECORD;
+BEGIN
+    FOR idx IN
+        SELECT * FROM (VALUES
+            ('idx_accounts_user', 'accounts', 'clerk_user_id'),
+            ('idx_positions_account', 'positions', 'account_id'),
+            ('idx_positions_symbol', 'positions', 'symbol'),
+            ('idx_jobs_user', 'jobs', 'clerk_user_id'),
+            ('idx_jobs_status', 'jobs', 'status')
+        ) AS v(index_name, table_name, column_name)
+    LOOP
+        EXECUTE format('CREATE INDEX IF NOT EXISTS %I ON %I(%I)',
+                       idx.index_name, idx.table_name, idx.column_name);
+    END LOOP;
+END
+$$;
 
 -- Create update timestamp trigger function
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -102,18 +115,21 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
--- Add update triggers to tables with updated_at
-CREATE TRIGGER update_users_updated_at BEFORE UPDATE ON users
-    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
-
-CREATE TRIGGER update_instruments_updated_at BEFORE UPDATE ON instruments
-    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
-
-CREATE TRIGGER update_accounts_updated_at BEFORE UPDATE ON accounts
-    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
-
-CREATE TRIGGER update_positions_updated_at BEFORE UPDATE ON positions
-    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
-
-CREATE TRIGGER update_jobs_updated_at BEFORE UPDATE ON jobs
-    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
\ No newline at end of file
+-- Add update triggers to tables with updated_at (skips ones that already exist)
+DO $$
+DECLARE
+    t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['users', 'instruments', 'accounts', 'positions', 'jobs'] LOOP
+        IF NOT EXISTS (
+            SELECT 1 FROM pg_trigger
+            WHERE tgname = 'update_' || t || '_updated_at'
+              AND tgrelid = t::regclass
+        ) THEN
+            EXECUTE format('CREATE TRIGGER %I BEFORE UPDATE ON %I '
+                           'FOR EACH ROW EXECUTE FUNCTION update_updated_at_column()',
+                           'update_' || t || '_updated_at', t);
+        END IF;
+    END LOOP;
+END
+$$;
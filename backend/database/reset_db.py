@@ -6,6 +6,7 @@ Drops all tables, recreates schema, and loads seed data
 
 import sys
 import argparse
+import subprocess
 from pathlib import Path
 from src.client import DataAPIClient
 from src.models import Database
@@ -26,12 +27,17 @@ def drop_all_tables(db: DataAPIClient):
         'users'
     ]
     
-    for table in tables_to_drop:
-        try:
-            db.execute(f"DROP TABLE IF EXISTS {table} CASCADE")
-            print(f"   ✅ Dropped {table}")
-        except Exception as e:
-            print(f"   ⚠️  Error dropping {table}: {e}")
+    # One fixed statement for all tables; per-table drops only if that fails
+    try:
+        db.execute(f"DROP TABLE IF EXISTS {', '.join(tables_to_drop)} CASCADE")
+        print("\n".join(f"   ✅ Dropped {table}" for table in tables_to_drop))
+    except Exception:
+        for table in tables_to_drop:
+            try:
+                db.execute(f"DROP TABLE IF EXISTS {table} CASCADE")
+                print(f"   ✅ Dropped {table}")
+            except Exception as e:
+                print(f"   ⚠️  Error dropping {table}: {e}")
     
     # Also drop the function
     try:
@@ -53,20 +59,19 @@ def create_test_data(db_models: Database):
         target_retirement_income=Decimal('100000')
     )
     
-    # Check if user exists
-    existing = db_models.users.find_by_clerk_id('test_user_001')
-    if existing:
-        print("   ℹ️  Test user already exists")
-    else:
-        # Use validated data from Pydantic model
-        validated = user_data.model_dump()
-        db_models.users.create_user(
-            clerk_user_id=validated['clerk_user_id'],
-            display_name=validated['display_name'],
-            years_until_retirement=validated['years_until_retirement'],
-            target_retirement_income=validated['target_retirement_income']
-        )
+    # Insert unless the user already exists, in a single round trip
+    validated = user_data.model_dump()
+    created = db_models.users.create_user(
+        clerk_user_id=validated['clerk_user_id'],
+        display_name=validated['display_name'],
+        years_until_retirement=validated['years_until_retirement'],
+        target_retirement_income=validated['target_retirement_income'],
+        if_not_exists=True
+    )
+    if created:
         print("   ✅ Created test user")
+    else:
+        print("   ℹ️  Test user already exists")
     
     # Create test accounts with Pydantic validation
     accounts = [
@@ -96,18 +101,10 @@ def create_test_data(db_models: Database):
         print(f"   ℹ️  User already has {len(user_accounts)} accounts")
         account_ids = [acc['id'] for acc in user_accounts]
     else:
-        account_ids = []
-        for acc_data in accounts:
-            validated = acc_data.model_dump()
-            acc_id = db_models.accounts.create_account(
-                'test_user_001',
-                account_name=validated['account_name'],
-                account_purpose=validated['account_purpose'],
-                cash_balance=validated['cash_balance'],
-                cash_interest=validated['cash_interest']
-            )
-            account_ids.append(acc_id)
-            print(f"   ✅ Created account: {validated['account_name']}")
+        # All three accounts go in one batch call
+        validated_accounts = [acc_data.model_dump() for acc_data in accounts]
+        account_ids = db_models.accounts.create_accounts('test_user_001', validated_accounts)
+        print("\n".join(f"   ✅ Created account: {validated['account_name']}" for validated in validated_accounts))
     
     # Create test positions in first account (401k)
     if account_ids:
@@ -125,20 +122,18 @@ def create_test_data(db_models: Database):
         if existing_positions:
             print(f"   ℹ️  Account already has {len(existing_positions)} positions")
         else:
+            # Validate positions with Pydantic, then upsert them in one batch call
+            holdings = []
             for symbol, quantity in positions:
-                # Validate position with Pydantic
                 position = PositionCreate(
                     account_id=account_id,
                     symbol=symbol,
                     quantity=quantity
                 )
                 validated = position.model_dump()
-                db_models.positions.add_position(
-                    validated['account_id'],
-                    validated['symbol'],
-                    validated['quantity']
-                )
-                print(f"   ✅ Added position: {quantity} shares of {symbol}")
+                holdings.append((validated['symbol'], validated['quantity']))
+            db_models.positions.add_positions(account_id, holdings)
+            print("\n".join(f"   ✅ Added position: {quantity} shares of {symbol}" for symbol, quantity in positions))
 
 
 def main():
@@ -162,7 +157,6 @@ def main():
         
         # Run migrations
         print("\n📝 Running migrations...")
-        import subprocess
         result = subprocess.run(['uv', 'run', 'run_migrations.py'], 
                               capture_output=True, text=True)
         
@@ -175,7 +169,6 @@ def main():
     
     # Load seed data
     print("\n🌱 Loading seed data...")
-    import subprocess
     result = subprocess.run(['uv', 'run', 'seed_data.py'], 
                           capture_output=True, text=True)
     
@@ -197,12 +190,13 @@ def main():
     # Final verification
     print("\n🔍 Final verification...")
     
-    # Count records
+    # Count records in one round trip (exact counts; pg_stat estimates lag
+    # right after a reset)
     tables = ['users', 'instruments', 'accounts', 'positions', 'jobs']
-    for table in tables:
-        result = db.query(f"SELECT COUNT(*) as count FROM {table}")
-        count = result[0]['count'] if result else 0
-        print(f"   • {table}: {count} records")
+    counts = {row['table_name']: row['count'] for row in db.query_iter(" UNION ALL ".join(
+        f"SELECT '{table}' as table_name, COUNT(*) as count FROM {table}" for table in tables
+    ))}
+    print("\n".join(f"   • {table}: {counts.get(table, 0)} records" for table in tables))
     
     print("\n" + "=" * 50)
     print("✅ Database reset complete!")
@@ -4,8 +4,15 @@ Simple migration runner that executes statements one by one
 """
 
 import os
+import sys
+import re
+import json
+import logging
+from logging.handlers import MemoryHandler
 import boto3
 from pathlib import Path
+from functools import partial
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from dotenv import load_dotenv
 
@@ -17,168 +24,276 @@ cluster_arn = os.environ.get('AURORA_CLUSTER_ARN')
 secret_arn = os.environ.get('AURORA_SECRET_ARN')
 database = os.environ.get('AURORA_DATABASE', 'alex')
 region = os.environ.get('AWS_REGION', 'us-east-1')
+# 'aurora' uses the RDS Data API; 'aurora_direct' opens one Postgres connection
+# to the cluster endpoint (requires network access to the VPC and psycopg)
+db_backend = os.environ.get('DB_BACKEND', 'aurora')
 
-if not cluster_arn or not secret_arn:
-    raise ValueError("Missing AURORA_CLUSTER_ARN or AURORA_SECRET_ARN in environment variables")
-
-client = boto3.client('rds-data', region_name=region)
-
-# Read migration file
-with open('migrations/001_schema.sql') as f:
-    sql = f.read()
-
-# Define statements in order (since splitting is complex)
-statements = [
-    # Extension
-    'CREATE EXTENSION IF NOT EXISTS "uuid-ossp"',
-    
-    # Tables
-    """CREATE TABLE IF NOT EXISTS users (
-        clerk_user_id VARCHAR(255) PRIMARY KEY,
-        display_name VARCHAR(255),
-        years_until_retirement INTEGER,
-        target_retirement_income DECIMAL(12,2),
-        asset_class_targets JSONB DEFAULT '{"equity": 70, "fixed_income": 30}',
-        region_targets JSONB DEFAULT '{"north_america": 50, "international": 50}',
-        created_at TIMESTAMP DEFAULT NOW(),
-        updated_at TIMESTAMP DEFAULT NOW()
-    )""",
-    
-    """CREATE TABLE IF NOT EXISTS instruments (
-        symbol VARCHAR(20) PRIMARY KEY,
-        name VARCHAR(255) NOT NULL,
-        instrument_type VARCHAR(50),
-        current_price DECIMAL(12,4),
-        allocation_regions JSONB DEFAULT '{}',
-        allocation_sectors JSONB DEFAULT '{}',
-        allocation_asset_class JSONB DEFAULT '{}',
-        created_at TIMESTAMP DEFAULT NOW(),
-        updated_at TIMESTAMP DEFAULT NOW()
-    )""",
-    
-    """CREATE TABLE IF NOT EXISTS accounts (
-        id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-        clerk_user_id VARCHAR(255) REFERENCES users(clerk_user_id) ON DELETE CASCADE,
-        account_name VARCHAR(255) NOT NULL,
-        account_purpose TEXT,
-        cash_balance DECIMAL(12,2) DEFAULT 0,
-        cash_interest DECIMAL(5,4) DEFAULT 0,
-        created_at TIMESTAMP DEFAULT NOW(),
-        updated_at TIMESTAMP DEFAULT NOW()
-    )""",
-    
-    """CREATE TABLE IF NOT EXISTS positions (
-        id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-        account_id UUID REFERENCES accounts(id) ON DELETE CASCADE,
-        symbol VARCHAR(20) REFERENCES instruments(symbol),
-        quantity DECIMAL(20,8) NOT NULL,
-        as_of_date DATE DEFAULT CURRENT_DATE,
-        created_at TIMESTAMP DEFAULT NOW(),
-        updated_at TIMESTAMP DEFAULT NOW(),
-        UNIQUE(account_id, symbol)
-    )""",
-    
-    """CREATE TABLE IF NOT EXISTS jobs (
-        id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-        clerk_user_id VARCHAR(255) REFERENCES users(clerk_user_id) ON DELETE CASCADE,
-        job_type VARCHAR(50) NOT NULL,
-        status VARCHAR(20) DEFAULT 'pending',
-        request_payload JSONB,
-        report_payload JSONB,
-        charts_payload JSONB,
-        retirement_payload JSONB,
-        summary_payload JSONB,
-        error_message TEXT,
-        created_at TIMESTAMP DEFAULT NOW(),
-        started_at TIMESTAMP,
-        completed_at TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT NOW()
-    )""",
-    
-    # Indexes
-    'CREATE INDEX IF NOT EXISTS idx_accounts_user ON accounts(clerk_user_id)',
-    'CREATE INDEX IF NOT EXISTS idx_positions_account ON positions(account_id)',
-    'CREATE INDEX IF NOT EXISTS idx_positions_symbol ON positions(symbol)',
-    'CREATE INDEX IF NOT EXISTS idx_jobs_user ON jobs(clerk_user_id)',
-    'CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)',
-    
-    # Function for timestamps
-    """CREATE OR REPLACE FUNCTION update_updated_at_column()
-    RETURNS TRIGGER AS $$
-    BEGIN
-        NEW.updated_at = NOW();
-        RETURN NEW;
-    END;
-    $$ LANGUAGE plpgsql""",
-    
-    # Triggers
-    """CREATE TRIGGER update_users_updated_at BEFORE UPDATE ON users
-        FOR EACH ROW EXECUTE FUNCTION update_updated_at_column()""",
-    
-    """CREATE TRIGGER update_instruments_updated_at BEFORE UPDATE ON instruments
-        FOR EACH ROW EXECUTE FUNCTION update_updated_at_column()""",
-    
-    """CREATE TRIGGER update_accounts_updated_at BEFORE UPDATE ON accounts
-        FOR EACH ROW EXECUTE FUNCTION update_updated_at_column()""",
-    
-    """CREATE TRIGGER update_positions_updated_at BEFORE UPDATE ON positions
-        FOR EACH ROW EXECUTE FUNCTION update_updated_at_column()""",
-    
-    """CREATE TRIGGER update_jobs_updated_at BEFORE UPDATE ON jobs
-        FOR EACH ROW EXECUTE FUNCTION update_updated_at_column()""",
-]
-
-print("🚀 Running database migrations...")
-print("=" * 50)
-
-success_count = 0
-error_count = 0
-
-for i, stmt in enumerate(statements, 1):
-    # Get a description of what we're creating
-    stmt_type = "statement"
-    if "CREATE TABLE" in stmt.upper():
-        stmt_type = "table"
-    elif "CREATE INDEX" in stmt.upper():
-        stmt_type = "index"
-    elif "CREATE TRIGGER" in stmt.upper():
-        stmt_type = "trigger"
-    elif "CREATE FUNCTION" in stmt.upper():
-        stmt_type = "function"
-    elif "CREATE EXTENSION" in stmt.upper():
-        stmt_type = "extension"
-    
-    # First non-empty line for display
-    first_line = next(l for l in stmt.split('\n') if l.strip())[:60]
-    print(f"\n[{i}/{len(statements)}] Creating {stmt_type}...")
-    print(f"    {first_line}...")
-    
+# Resolved once at import so the runner works from any working directory
+_HERE = Path(__file__).resolve().parent
+MIGRATION_FILE = _HERE / 'migrations' / '001_schema.sql'
+
+
+def connect_direct():
+    """Open a direct Postgres connection to the cluster using the Data API secret"""
+    import psycopg
+
+    rds = boto3.client('rds', region_name=region)
+    cluster = rds.describe_db_clusters(
+        DBClusterIdentifier=cluster_arn.split(':')[-1]
+    )['DBClusters'][0]
+
+    secrets = boto3.client('secretsmanager', region_name=region)
+    credentials = json.loads(secrets.get_secret_value(SecretId=secret_arn)['SecretString'])
+
+    return psycopg.connect(
+        host=cluster['Endpoint'],
+        port=cluster['Port'],
+        dbname=database,
+        user=credentials['username'],
+        password=credentials['password'],
+        sslmode='require',
+        autocommit=True,
+    )
+
+
+def split_sql_statements(sql_content):
+    """Split a migration file into individual statements (comments removed)"""
+    # Only needed when the statement cache is stale, so not imported up front
+    import sqlparse
+
+    statements = []
+    for raw in sqlparse.split(sql_content):
+        stmt = sqlparse.format(raw, strip_comments=True).strip().rstrip(';').strip()
+        if stmt:
+            statements.append(stmt)
+    return statements
+
+
+# Statement prefix -> description, checked against the upper-cased head only
+STATEMENT_KINDS = (
+    ("CREATE TABLE", "table"),
+    ("CREATE INDEX", "index"),
+    ("CREATE TRIGGER", "trigger"),
+    ("CREATE FUNCTION", "function"),
+    ("CREATE OR REPLACE FUNCTION", "function"),
+    ("CREATE EXTENSION", "extension"),
+    ("DO ", "DO block"),
+)
+
+
+def classify_statement(stmt):
+    """Describe what a statement creates, upper-casing only its first few words"""
+    head = stmt.lstrip()[:32].upper()
+    return next((kind for prefix, kind in STATEMENT_KINDS if head.startswith(prefix)), "statement")
+
+
+def load_statements(migration_file=MIGRATION_FILE):
+    """
+    Load the split statements for a migration file.
+
+    The split result is cached next to the .sql file and reused while it is
+    newer than the source, so repeat runs skip re-parsing the migration.
+    """
+    migration_file = Path(migration_file)
+    cache_file = migration_file.with_name(migration_file.name + '.statements.json')
+
+    if cache_file.exists() and cache_file.stat().st_mtime >= migration_file.stat().st_mtime:
+        try:
+            return json.loads(cache_file.read_text())
+        except (OSError, ValueError):
+            pass  # Unreadable cache, re-parse below
+
+    statements = split_sql_statements(migration_file.read_text())
     try:
-        response = client.execute_statement(
-            resourceArn=cluster_arn,
-            secretArn=secret_arn,
-            database=database,
-            sql=stmt
-        )
-        print(f"    ✅ Success")
-        success_count += 1
-        
-    except ClientError as e:
-        error_msg = e.response['Error']['Message']
-        if 'already exists' in error_msg.lower():
-            print(f"    ⚠️  Already exists (skipping)")
-            success_count += 1
-        else:
-            print(f"    ❌ Error: {error_msg[:100]}")
-            error_count += 1
-
-print("\n" + "=" * 50)
-print(f"Migration complete: {success_count} successful, {error_count} errors")
-
-if error_count == 0:
-    print("\n✅ All migrations completed successfully!")
-    print("\n📝 Next steps:")
-    print("1. Load seed data: uv run seed_data.py")
-    print("2. Test database operations: uv run test_db.py")
-else:
-    print(f"\n⚠️  Some statements failed. Check errors above.")
\ No newline at end of file
+        cache_file.write_text(json.dumps(statements))
+    except OSError:
+        pass  # Read-only checkout, just skip caching
+    return statements
+
+
+# Objects that already exist in the current schema, fetched in one round trip
+EXISTING_OBJECTS_SQL = """
+    SELECT 'relation', c.relname
+    FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = current_schema()
+    UNION ALL
+    SELECT 'extension', extname FROM pg_extension
+    UNION ALL
+    SELECT 'trigger', tgname FROM pg_trigger WHERE NOT tgisinternal
+"""
+
+# Statement kind -> catalog the target lives in. Functions (CREATE OR REPLACE)
+# and DO blocks are idempotent by themselves and always run.
+TARGET_CATALOGS = {"table": "relation", "index": "relation", "extension": "extension", "trigger": "trigger"}
+TARGET_NAME_RE = re.compile(r'^CREATE\s+\w+\s+(?:IF\s+NOT\s+EXISTS\s+)?"?([\w-]+)"?', re.IGNORECASE)
+
+
+def statement_target(stmt, kind):
+    """Return the (catalog, name) a CREATE statement would add, or None"""
+    catalog = TARGET_CATALOGS.get(kind)
+    match = TARGET_NAME_RE.match(stmt) if catalog else None
+    return (catalog, match.group(1)) if match else None
+
+
+# Postgres SQLSTATEs meaning "the object this statement creates already exists":
+# duplicate_table, duplicate_schema, duplicate_object, duplicate_function
+DUPLICATE_OBJECT_STATES = frozenset({'42P07', '42P06', '42710', '42723'})
+SQLSTATE_RE = re.compile(r'SQLState:\s*(\w{5})')
+
+
+def bind_backend():
+    """
+    Bind the configured backend once.
+
+    Returns (execute, fetch_rows, close, errors, describe_error) where
+    execute(sql) runs a statement, fetch_rows(sql) returns result rows as
+    tuples, errors is the exception type a failed statement raises and
+    describe_error(e) turns one into (sqlstate, message). The run loop calls
+    these directly with no per-statement backend checks.
+    """
+    if db_backend == 'aurora_direct':
+        import psycopg
+
+        conn = connect_direct()
+
+        def execute(sql):
+            conn.execute(sql)
+
+        def fetch_rows(sql):
+            return conn.execute(sql).fetchall()
+
+        def describe_error(e):
+            return e.sqlstate, str(e).strip()
+
+        return execute, fetch_rows, conn.close, psycopg.Error, describe_error
+
+    # One client for the whole run; keep-alive lets every statement reuse the same
+    # HTTPS connection instead of paying a fresh TCP/TLS handshake
+    client = boto3.client(
+        'rds-data',
+        region_name=region,
+        config=Config(tcp_keepalive=True),
+    )
+    execute_data_api = partial(
+        client.execute_statement,
+        resourceArn=cluster_arn,
+        secretArn=secret_arn,
+        database=database,
+    )
+
+    def execute(sql):
+        execute_data_api(sql=sql)
+
+    def fetch_rows(sql):
+        records = execute_data_api(sql=sql).get('records', [])
+        return [tuple(next(iter(field.values())) for field in record) for record in records]
+
+    def describe_error(e):
+        # Data API errors carry the Postgres code as "...; SQLState: 42P07"
+        message = e.response['Error']['Message']
+        match = SQLSTATE_RE.search(message)
+        return (match.group(1) if match else None), message
+
+    return execute, fetch_rows, client.close, ClientError, describe_error
+
+
+def fetch_existing_objects(fetch_rows):
+    """Query the catalogs once for everything the migration might create"""
+    try:
+        return set(fetch_rows(EXISTING_OBJECTS_SQL))
+    except Exception:
+        return set()  # Can't tell, so let every statement run
+
+
+def execute_statement(execute, errors, describe_error, stmt):
+    """Run one statement, returning (ok, message) instead of raising"""
+    try:
+        execute(stmt)
+        return True, "✅ Success"
+    except errors as e:
+        sqlstate, error_msg = describe_error(e)
+
+    # Only fall back to message text when the error carried no SQLSTATE
+    if sqlstate in DUPLICATE_OBJECT_STATES or (sqlstate is None and 'already exists' in error_msg.lower()):
+        return True, "⚠️  Already exists (skipping)"
+    return False, f"❌ Error: {error_msg[:100]}"
+
+
+logger = logging.getLogger('run_migrations')
+
+
+def setup_logging():
+    """
+    Send progress output to stdout through a memory buffer.
+
+    Lines are written in one go at the end of the run, or as soon as a failed
+    statement is logged at ERROR, rather than one flushed write per line.
+    """
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(logging.Formatter('%(message)s'))
+    buffer = MemoryHandler(capacity=1000, flushLevel=logging.ERROR, target=stream)
+    logger.addHandler(buffer)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return buffer
+
+
+def main():
+    log_buffer = setup_logging()
+
+    if not cluster_arn or not secret_arn:
+        raise ValueError("Missing AURORA_CLUSTER_ARN or AURORA_SECRET_ARN in environment variables")
+
+    execute, fetch_rows, close, errors, describe_error = bind_backend()
+
+    try:
+        # Load the migration statements (parsed once, then cached)
+        statements = load_statements(MIGRATION_FILE)
+
+        # On re-runs most objects are already there; skip those without a round trip
+        existing = fetch_existing_objects(fetch_rows)
+
+        def run(stmt, kind):
+            if statement_target(stmt, kind) in existing:
+                return True, "⚠️  Already exists (skipping)"
+            return execute_statement(execute, errors, describe_error, stmt)
+
+        logger.info("🚀 Running database migrations...")
+        logger.info("=" * 50)
+
+        success_count = 0
+        error_count = 0
+
+        for i, stmt in enumerate(statements, 1):
+            stmt_type = classify_statement(stmt)
+            ok, message = run(stmt, stmt_type)
+
+            # First non-empty line for display
+            first_line = next(l for l in stmt.split('\n') if l.strip())[:60]
+            logger.info("\n[%d/%d] Creating %s...", i, len(statements), stmt_type)
+            logger.info("    %s...", first_line)
+            if ok:
+                logger.info("    %s", message)
+                success_count += 1
+            else:
+                logger.error("    %s", message)
+                error_count += 1
+    finally:
+        close()
+
+    logger.info("\n" + "=" * 50)
+    logger.info("Migration complete: %d successful, %d errors", success_count, error_count)
+
+    if error_count == 0:
+        logger.info("\n✅ All migrations completed successfully!")
+        logger.info("\n📝 Next steps:")
+        logger.info("1. Load seed data: uv run seed_data.py")
+        logger.info("2. Test database operations: uv run test_db.py")
+    else:
+        logger.info("\n⚠️  Some statements failed. Check errors above.")
+
+    log_buffer.flush()
+
+
+if __name__ == "__main__":
+    main()
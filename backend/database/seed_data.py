@@ -6,24 +6,29 @@ Loads 20+ popular ETF instruments with allocation data
 
 import os
 import json
-import boto3
-from botocore.exceptions import ClientError
-from src.schemas import InstrumentCreate
-from pydantic import ValidationError
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv(override=True)
 
 # Get config from environment
-cluster_arn = os.environ.get('AURORA_CLUSTER_ARN')
-secret_arn = os.environ.get('AURORA_SECRET_ARN')
+REQUIRED_ENV = ('AURORA_CLUSTER_ARN', 'AURORA_SECRET_ARN')
+missing = [name for name in REQUIRED_ENV if not os.environ.get(name)]
+if missing:
+    # Fail before paying for the boto3 import below
+    print(f"❌ Missing {' or '.join(missing)} in .env file")
+    exit(1)
+
+cluster_arn = os.environ['AURORA_CLUSTER_ARN']
+secret_arn = os.environ['AURORA_SECRET_ARN']
 database = os.environ.get('AURORA_DATABASE', 'alex')
 region = os.environ.get('AWS_REGION', 'us-east-1')
 
-if not cluster_arn or not secret_arn:
-    print("❌ Missing AURORA_CLUSTER_ARN or AURORA_SECRET_ARN in .env file")
-    exit(1)
+# Imported after the env check on purpose, so a misconfigured run exits first
+import boto3
+from botocore.exceptions import ClientError
+from src.schemas import InstrumentCreate
+from pydantic import ValidationError
 
 client = boto3.client('rds-data', region_name=region)
 
@@ -296,6 +301,45 @@ INSTRUMENTS = [
     }
 ]
 
+# Upsert statement shared by every instrument; the SQL text never changes so
+# it is sent once per batch with one parameter set per row
+INSERT_INSTRUMENT_SQL = """
+    INSERT INTO instruments (
+        symbol, name, instrument_type, current_price,
+        allocation_regions, allocation_sectors, allocation_asset_class
+    ) VALUES (
+        :symbol, :name, :instrument_type, :current_price::numeric,
+        :allocation_regions::jsonb, :allocation_sectors::jsonb, :allocation_asset_class::jsonb
+    )
+    ON CONFLICT (symbol) DO UPDATE SET
+        name = EXCLUDED.name,
+        instrument_type = EXCLUDED.instrument_type,
+        current_price = EXCLUDED.current_price,
+        allocation_regions = EXCLUDED.allocation_regions,
+        allocation_sectors = EXCLUDED.allocation_sectors,
+        allocation_asset_class = EXCLUDED.allocation_asset_class,
+        updated_at = NOW()
+"""
+
+
+def instrument_parameters(validated):
+    """Build the Data API parameter list for a validated instrument"""
+    return [
+        {'name': 'symbol', 'value': {'stringValue': validated['symbol']}},
+        {'name': 'name', 'value': {'stringValue': validated['name']}},
+        {'name': 'instrument_type', 'value': {'stringValue': validated['instrument_type']}},
+        {'name': 'current_price', 'value': {'stringValue': str(validated.get('current_price', 0))}},
+        {'name': 'allocation_regions', 'value': {'stringValue': json.dumps(validated['allocation_regions'])}},
+        {'name': 'allocation_sectors', 'value': {'stringValue': json.dumps(validated['allocation_sectors'])}},
+        {'name': 'allocation_asset_class', 'value': {'stringValue': json.dumps(validated['allocation_asset_class'])}}
+    ]
+
+
+def field_value(field):
+    """Value of a Data API field, which always has exactly one typed key"""
+    return next(iter(field.values()))
+
+
 def insert_instrument(instrument_data):
     """Insert a single instrument into the database with Pydantic validation"""
     # Validate with Pydantic first
@@ -305,46 +349,43 @@ def insert_instrument(instrument_data):
         print(f"    ❌ Validation error: {e}")
         return False
     
-    # Get validated data
-    validated = instrument.model_dump()
-    
-    sql = """
-        INSERT INTO instruments (
-            symbol, name, instrument_type, current_price,
-            allocation_regions, allocation_sectors, allocation_asset_class
-        ) VALUES (
-            :symbol, :name, :instrument_type, :current_price::numeric,
-            :allocation_regions::jsonb, :allocation_sectors::jsonb, :allocation_asset_class::jsonb
+    try:
+        client.execute_statement(
+            resourceArn=cluster_arn,
+            secretArn=secret_arn,
+            database=database,
+            sql=INSERT_INSTRUMENT_SQL,
+            parameters=instrument_parameters(instrument.model_dump())
         )
-        ON CONFLICT (symbol) DO UPDATE SET
-            name = EXCLUDED.name,
-            instrument_type = EXCLUDED.instrument_type,
-            current_price = EXCLUDED.current_price,
-            allocation_regions = EXCLUDED.allocation_regions,
-            allocation_sectors = EXCLUDED.allocation_sectors,
-            allocation_asset_class = EXCLUDED.allocation_asset_class,
-            updated_at = NOW()
+        return True
+    except ClientError as e:
+        print(f"    ❌ Error: {e.response['Error']['Message'][:100]}")
+        return False
+
+
+def insert_instruments(instruments):
+    """
+    Insert all instruments with a single BatchExecuteStatement call.
+
+    Returns True if the batch succeeded. Instruments are validated up front by
+    main(), so a failure here is a database error.
     """
+    parameter_sets = [
+        instrument_parameters(InstrumentCreate(**inst).model_dump())
+        for inst in instruments
+    ]
     
     try:
-        response = client.execute_statement(
+        client.batch_execute_statement(
             resourceArn=cluster_arn,
             secretArn=secret_arn,
             database=database,
-            sql=sql,
-            parameters=[
-                {'name': 'symbol', 'value': {'stringValue': validated['symbol']}},
-                {'name': 'name', 'value': {'stringValue': validated['name']}},
-                {'name': 'instrument_type', 'value': {'stringValue': validated['instrument_type']}},
-                {'name': 'current_price', 'value': {'stringValue': str(validated.get('current_price', 0))}},
-                {'name': 'allocation_regions', 'value': {'stringValue': json.dumps(validated['allocation_regions'])}},
-                {'name': 'allocation_sectors', 'value': {'stringValue': json.dumps(validated['allocation_sectors'])}},
-                {'name': 'allocation_asset_class', 'value': {'stringValue': json.dumps(validated['allocation_asset_class'])}}
-            ]
+            sql=INSERT_INSTRUMENT_SQL,
+            parameterSets=parameter_sets
         )
         return True
     except ClientError as e:
-        print(f"    ❌ Error: {e.response['Error']['Message'][:100]}")
+        print(f"  ⚠️  Batch insert failed: {e.response['Error']['Message'][:100]}")
         return False
 
 def verify_allocations(instrument):
@@ -381,17 +422,23 @@ def main():
     
     print("  ✅ All allocations valid!")
     
-    # Insert instruments
+    # Insert instruments in one round trip
     print("\n💾 Inserting instruments...")
     success_count = 0
     
-    for inst in INSTRUMENTS:
-        print(f"  [{success_count + 1}/{len(INSTRUMENTS)}] {inst['symbol']}: {inst['name'][:40]}...")
-        if insert_instrument(inst):
-            print(f"    ✅ Success")
-            success_count += 1
-        else:
-            print(f"    ❌ Failed")
+    if insert_instruments(INSTRUMENTS):
+        success_count = len(INSTRUMENTS)
+        print("\n".join(f"  ✅ {inst['symbol']}: {inst['name'][:40]}" for inst in INSTRUMENTS))
+    else:
+        # Fall back to one statement per instrument to pinpoint the failure
+        print("  Retrying one instrument at a time...")
+        for inst in INSTRUMENTS:
+            print(f"  [{success_count + 1}/{len(INSTRUMENTS)}] {inst['symbol']}: {inst['name'][:40]}...")
+            if insert_instrument(inst):
+                print(f"    ✅ Success")
+                success_count += 1
+            else:
+                print(f"    ❌ Failed")
     
     print("\n" + "=" * 50)
     print(f"Seeding complete: {success_count}/{len(INSTRUMENTS)} instruments loaded")
@@ -405,7 +452,7 @@ def main():
             database=database,
             sql="SELECT COUNT(*) as count FROM instruments"
         )
-        count = response['records'][0][0]['longValue']
+        count = field_value(response['records'][0][0])
         print(f"  Database now contains {count} instruments")
         
         # Show a sample
@@ -417,9 +464,9 @@ def main():
         )
         
         print("\n  Sample instruments:")
-        for record in response['records']:
-            symbol = record[0]['stringValue']
-            name = record[1]['stringValue']
+        for symbol_field, name_field in response['records']:
+            symbol = field_value(symbol_field)
+            name = field_value(name_field)
             print(f"    - {symbol}: {name}")
         
     except ClientError as e:
@@ -4,13 +4,44 @@ Provides a simple interface for database operations
 """
 
 import boto3
+import copy
 import json
 import os
-from typing import List, Dict, Any, Optional, Tuple
+import time
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from datetime import date, datetime
 from decimal import Decimal
-from botocore.exceptions import ClientError
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from uuid import UUID
+
+
+def _uuid_to_str(value: Any) -> str:
+    """json.dumps default hook: encode UUIDs as orjson does, reject anything else"""
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+try:
+    import orjson
+
+    # Match the stdlib branch: int keys become strings, and datetimes and
+    # dataclasses reach no default hook, so they raise TypeError just as they do there
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+    def _dumps(value: Any) -> str:
+        return orjson.dumps(value, option=_ORJSON_OPTIONS).decode()
+
+    _loads = orjson.loads
+except ImportError:
+    # orjson is optional (uv sync --extra fast); both branches store the same JSON
+    def _dumps(value: Any) -> str:
+        return json.dumps(value, default=_uuid_to_str)
+
+    _loads = json.loads
 
 # Try to load .env file if it exists
 try:
@@ -22,6 +53,175 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# HTTP connections kept open per rds-data client (botocore's default is 10);
+# size to the number of threads issuing queries concurrently
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "25"))
+
+# rds-data clients shared by every DataAPIClient in the process, keyed by region
+_RDS_DATA_CLIENTS: Dict[str, Any] = {}
+
+# warm() runs during Lambda init, so it gets one short attempt instead of the
+# shared client's retry policy; an unreachable or resuming cluster fails fast
+WARM_CONFIG = Config(connect_timeout=2, read_timeout=5, retries={"total_max_attempts": 1})
+
+# Opt-in query(cache=True) result cache: entries live DB_QUERY_TTL seconds and
+# are dropped whenever this client writes
+DB_QUERY_TTL = float(os.environ.get("DB_QUERY_TTL", "5"))
+QUERY_CACHE_MAX_ENTRIES = 4096
+
+# BatchExecuteStatement limits: keep each request well under the 4 MiB cap
+BATCH_MAX_ROWS = 1000
+BATCH_MAX_BYTES = 3_500_000
+
+
+# JSONB columns per table (mirrors migrations/001_schema.sql). Built once so
+# values already serialised to a JSON string still get the ::jsonb cast.
+_JSONB_COLUMNS: Dict[str, frozenset] = {
+    "users": frozenset({"asset_class_targets", "region_targets"}),
+    "instruments": frozenset({"allocation_regions", "allocation_sectors", "allocation_asset_class"}),
+    "jobs": frozenset({
+        "request_payload", "report_payload", "charts_payload",
+        "retirement_payload", "summary_payload",
+    }),
+}
+# UUID columns per table. The Data API sends Python strings as varchar, and
+# Postgres has no implicit varchar -> uuid cast, so insert, update and
+# bulk_update give these an explicit ::uuid
+_UUID_COLUMNS: Dict[str, frozenset] = {
+    "accounts": frozenset({"id"}),
+    "positions": frozenset({"id", "account_id"}),
+    "jobs": frozenset({"id"}),
+}
+_NO_COLUMNS = frozenset()
+# Fallback for result columns the Data API reports without a typeName
+_ALL_JSONB_COLUMNS = frozenset().union(*_JSONB_COLUMNS.values())
+_JSON_TYPE_NAMES = frozenset({"jsonb", "json"})
+
+
+def _is_json_column(column: Dict) -> bool:
+    """Whether a columnMetadata entry holds JSON that query() should parse"""
+    type_name = column.get("typeName")
+    if type_name:
+        return type_name.lower() in _JSON_TYPE_NAMES
+    return column.get("name") in _ALL_JSONB_COLUMNS
+
+
+def _typed_placeholder(
+    col: str, value: Any, jsonb_columns: frozenset = _NO_COLUMNS, uuid_columns: frozenset = _NO_COLUMNS
+) -> str:
+    """Return the :param placeholder for a column, with a cast where Postgres needs one"""
+    if col in uuid_columns:
+        return f":{col}::uuid"
+    elif col in jsonb_columns or isinstance(value, (dict, list)):
+        return f":{col}::jsonb"
+    elif isinstance(value, Decimal):
+        return f":{col}::numeric"
+    elif isinstance(value, date) and not isinstance(value, datetime):
+        return f":{col}::date"
+    elif isinstance(value, datetime):
+        return f":{col}::timestamp"
+    return f":{col}"
+
+
+# (table, columns, value types, returning) -> INSERT statement
+_INSERT_SQL_CACHE: Dict[Tuple, str] = {}
+
+
+def _insert_sql(table: str, data: Dict, returning: str = None, on_conflict: str = None) -> str:
+    """Build the INSERT for a row's shape, reusing it for later rows of the same shape"""
+    # Sorted so the same columns in any dict order give identical SQL text
+    columns = tuple(sorted(data))
+    key = (table, columns, tuple(type(data[col]) for col in columns), returning, on_conflict)
+    sql = _INSERT_SQL_CACHE.get(key)
+    if sql is None:
+        jsonb_columns = _JSONB_COLUMNS.get(table, _NO_COLUMNS)
+        uuid_columns = _UUID_COLUMNS.get(table, _NO_COLUMNS)
+        placeholders = [_typed_placeholder(col, data[col], jsonb_columns, uuid_columns) for col in columns]
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(placeholders)})"
+        if on_conflict:
+            sql += f" ON CONFLICT {on_conflict}"
+        if returning:
+            sql += f" RETURNING {returning}"
+        _INSERT_SQL_CACHE[key] = sql
+    return sql
+
+
+def _parse_json(value: str) -> Any:
+    try:
+        return _loads(value)
+    except ValueError:
+        return value
+
+
+# Data API field type -> Python value
+_FIELD_DECODERS = {
+    "isNull": lambda value: None,
+    "booleanValue": lambda value: value,
+    "longValue": lambda value: value,
+    "doubleValue": lambda value: value,
+    "stringValue": lambda value: value,
+    "blobValue": lambda value: value,
+}
+
+def _field_value(field: Dict) -> Any:
+    """Extract the value from a Data API field"""
+    # Data API fields carry exactly one key naming their type
+    for kind, value in field.items():
+        decode = _FIELD_DECODERS.get(kind)
+        return decode(value) if decode else None
+    return None
+
+
+def _json_field_value(field: Dict) -> Any:
+    """Extract and parse the value of a JSON / JSONB column"""
+    value = _field_value(field)
+    return _parse_json(value) if isinstance(value, str) else value
+
+
+# Python type -> Data API value. Keyed on the exact type, so bool never
+# falls through to int
+_PARAM_ENCODERS = {
+    type(None): lambda value: {"isNull": True},
+    bool: lambda value: {"booleanValue": value},
+    int: lambda value: {"longValue": value},
+    float: lambda value: {"doubleValue": value},
+    Decimal: lambda value: {"stringValue": str(value)},
+    date: lambda value: {"stringValue": value.isoformat()},
+    datetime: lambda value: {"stringValue": value.isoformat()},
+    dict: lambda value: {"stringValue": _dumps(value)},
+    list: lambda value: {"stringValue": _dumps(value)},
+}
+
+
+def _encode_value(value: Any) -> Dict:
+    """Convert a Python value to a Data API parameter value"""
+    encode = _PARAM_ENCODERS.get(type(value))
+    if encode is None:
+        # Subclasses (IntEnum, pendulum datetimes, ...) take the first matching base
+        encode = next(
+            (enc for typ, enc in _PARAM_ENCODERS.items() if isinstance(value, typ)),
+            lambda value: {"stringValue": str(value)},
+        )
+    return encode(value)
+
+
+def _get_rds_data_client(region: str):
+    """Return the shared rds-data client for a region, creating it on first use"""
+    client = _RDS_DATA_CLIENTS.get(region)
+    if client is None:
+        client = boto3.client(
+            "rds-data",
+            region_name=region,
+            config=Config(
+                max_pool_connections=DB_POOL_SIZE,
+                # Keep idle pooled connections alive so later calls skip the TLS handshake
+                tcp_keepalive=True,
+                retries={"max_attempts": 3, "mode": "standard"},
+            ),
+        )
+        _RDS_DATA_CLIENTS[region] = client
+    return client
+
 
 class DataAPIClient:
     """Wrapper for AWS RDS Data API to simplify database operations"""
@@ -52,8 +252,9 @@ class DataAPIClient:
                 "Set AURORA_CLUSTER_ARN and AURORA_SECRET_ARN environment variables."
             )
 
-        self.region = os.environ.get("DEFAULT_AWS_REGION", "us-east-1")
-        self.client = boto3.client("rds-data", region_name=self.region)
+        self.region = region or os.environ.get("DEFAULT_AWS_REGION", "us-east-1")
+        self.client = _get_rds_data_client(self.region)
+        self._query_cache: Dict[Tuple[str, str], Tuple[float, List[Dict]]] = {}
 
     def execute(self, sql: str, parameters: List[Dict] = None) -> Dict:
         """
@@ -78,93 +279,128 @@ class DataAPIClient:
             if parameters:
                 kwargs["parameters"] = parameters
 
+            # Anything other than a plain read may change cached results
+            if self._query_cache and not self._is_select(sql):
+                self._query_cache.clear()
+
             response = self.client.execute_statement(**kwargs)
             return response
 
         except ClientError as e:
-            logger.error(f"Database error: {e}")
+            logger.error("Database error: %s", e)
             raise
 
-    def query(self, sql: str, parameters: List[Dict] = None) -> List[Dict]:
+    def query(self, sql: str, parameters: List[Dict] = None, cache: bool = False) -> List[Dict]:
         """
         Execute a SELECT query and return results as list of dicts
 
         Args:
             sql: SELECT statement
             parameters: Optional parameters
+            cache: Reuse the result of an identical SELECT run within the last
+                DB_QUERY_TTL seconds (cleared by any write through this client;
+                writes by other clients or processes can return stale rows
+                until the entry expires)
 
         Returns:
             List of dictionaries with column names as keys
         """
-        response = self.execute(sql, parameters)
+        if cache and self._is_select(sql):
+            key = (sql, json.dumps(parameters, sort_keys=True, default=str))
+            hit = self._query_cache.get(key)
+            # Deep copies, so a caller editing a row or a nested JSONB value
+            # never changes what later hits return
+            if hit and hit[0] > time.monotonic():
+                return copy.deepcopy(hit[1])
+
+            results = self.query(sql, parameters)
+            if len(self._query_cache) >= QUERY_CACHE_MAX_ENTRIES:
+                self._query_cache.pop(next(iter(self._query_cache)))
+            self._query_cache[key] = (time.monotonic() + DB_QUERY_TTL, results)
+            return copy.deepcopy(results)
+
+        return list(self.query_iter(sql, parameters))
+
+    def query_iter(self, sql: str, parameters: List[Dict] = None) -> Iterator[Dict]:
+        """
+        Execute a SELECT query and yield rows one at a time
 
-        if "records" not in response:
-            return []
+        Rows are converted as they are consumed, so callers that stop early
+        (or only stream rows onward) never build the full list of dicts.
+
+        Args:
+            sql: SELECT statement
+            parameters: Optional parameters
 
-        # Extract column names
-        columns = [col["name"] for col in response.get("columnMetadata", [])]
+        Yields:
+            Dictionaries with column names as keys
+        """
+        response = self.execute(sql, parameters)
 
-        # Convert records to dictionaries
-        results = []
-        for record in response["records"]:
-            row = {}
-            for i, col in enumerate(columns):
-                value = self._extract_value(record[i])
-                row[col] = value
-            results.append(row)
+        # Extract column names, and pick each column's converter once per query
+        metadata = response.get("columnMetadata", [])
+        columns = [col["name"] for col in metadata]
+        extractors = [_json_field_value if _is_json_column(col) else _field_value for col in metadata]
 
-        return results
+        for record in response.get("records", ()):
+            yield dict(zip(columns, [extract(field) for extract, field in zip(extractors, record)]))
 
-    def query_one(self, sql: str, parameters: List[Dict] = None) -> Optional[Dict]:
+    def query_one(self, sql: str, parameters: List[Dict] = None, cache: bool = False) -> Optional[Dict]:
         """
         Execute a SELECT query and return first result
 
         Args:
             sql: SELECT statement
             parameters: Optional parameters
+            cache: Reuse a recent identical result (see query); rows may be up
+                to DB_QUERY_TTL seconds stale if another process wrote them
 
         Returns:
             Dictionary with column names as keys, or None if no results
         """
-        results = self.query(sql, parameters)
-        return results[0] if results else None
+        if cache:
+            results = self.query(sql, parameters, cache=True)
+            return results[0] if results else None
+        return next(self.query_iter(sql, parameters), None)
 
-    def insert(self, table: str, data: Dict, returning: str = None) -> str:
+    def query_many(self, queries: List[Tuple[str, Optional[List[Dict]]]]) -> List[List[Dict]]:
+        """
+        Run several independent SELECT queries concurrently
+
+        Each Data API call is a blocking HTTPS round trip; issuing them from a
+        thread pool over the shared client makes the total wait roughly the
+        slowest query instead of the sum of all of them.
+
+        Args:
+            queries: (sql, parameters) pairs
+
+        Returns:
+            One result list per query, in the same order
+        """
+        if len(queries) <= 1:
+            return [self.query(sql, parameters) for sql, parameters in queries]
+
+        with ThreadPoolExecutor(max_workers=min(len(queries), DB_POOL_SIZE)) as pool:
+            return list(pool.map(lambda q: self.query(*q), queries))
+
+    def insert(self, table: str, data: Dict, returning: str = None, on_conflict: str = None) -> str:
         """
         Insert a record into a table
 
         Args:
             table: Table name
             data: Dictionary of column names and values
-            returning: Column to return (e.g., 'id', 'clerk_user_id')
+            returning: Column to return (e.g., 'id', 'clerk_user_id'), or '*' for
+                the whole inserted row as a dict
+            on_conflict: ON CONFLICT action (e.g., '(clerk_user_id) DO NOTHING')
 
         Returns:
-            Value of returning column if specified
-        """
-        columns = list(data.keys())
-        placeholders = []
-
-        # Check if columns need type casting
-        for col in columns:
-            if isinstance(data[col], (dict, list)):
-                placeholders.append(f":{col}::jsonb")
-            elif isinstance(data[col], Decimal):
-                placeholders.append(f":{col}::numeric")
-            elif isinstance(data[col], date) and not isinstance(data[col], datetime):
-                placeholders.append(f":{col}::date")
-            elif isinstance(data[col], datetime):
-                placeholders.append(f":{col}::timestamp")
-            else:
-                placeholders.append(f":{col}")
-
-        sql = f"""
-            INSERT INTO {table} ({", ".join(columns)})
-            VALUES ({", ".join(placeholders)})
+            Value of returning column if specified (None if the row was skipped)
         """
-
-        # Add RETURNING clause if specified
-        if returning:
-            sql += f" RETURNING {returning}"
+        sql = _insert_sql(table, data, returning, on_conflict)
+        if returning == "*":
+            # Same round trip as the insert, so callers need no follow-up SELECT
+            return next(self.query_iter(sql, self._build_parameters(data)), None)
 
         parameters = self._build_parameters(data)
         response = self.execute(sql, parameters)
@@ -174,6 +410,80 @@ class DataAPIClient:
             return self._extract_value(response["records"][0][0])
         return None
 
+    def bulk_insert(self, table: str, rows: List[Dict], returning: str = None) -> List:
+        """
+        Insert many records with BatchExecuteStatement
+
+        All rows must have the same columns; the SQL and type casts are built
+        once from the first row. Rows are sent in chunks that stay under the
+        Data API request limits.
+
+        Args:
+            table: Table name
+            rows: List of dictionaries of column names and values
+            returning: Column to return for each row (e.g., 'id')
+
+        Returns:
+            List of returning-column values if specified, otherwise []
+        """
+        if not rows:
+            return []
+
+        sql = _insert_sql(table, rows[0], returning)
+
+        returned = []
+        for chunk in self._batch_chunks([self._build_parameters(row) for row in rows]):
+            response = self.batch_execute(sql, chunk)
+            if returning:
+                for result in response.get("updateResults", []):
+                    fields = result.get("generatedFields") or [{"isNull": True}]
+                    returned.append(self._extract_value(fields[0]))
+        return returned
+
+    def batch_execute(self, sql: str, parameter_sets: List[List[Dict]]) -> Dict:
+        """
+        Execute one SQL statement against many parameter sets in one call
+
+        Args:
+            sql: SQL statement to execute
+            parameter_sets: One Data API parameter list per execution
+
+        Returns:
+            Response from Data API
+        """
+        try:
+            self._query_cache.clear()
+            return self.client.batch_execute_statement(
+                resourceArn=self.cluster_arn,
+                secretArn=self.secret_arn,
+                database=self.database,
+                sql=sql,
+                parameterSets=parameter_sets,
+            )
+        except ClientError as e:
+            logger.error("Database error: %s", e)
+            raise
+
+    @staticmethod
+    def _is_select(sql: str) -> bool:
+        """True for statements that only read (SELECT / WITH ... SELECT)"""
+        head = sql.lstrip()[:6].upper()
+        return head == "SELECT" or head.startswith("WITH")
+
+    @staticmethod
+    def _batch_chunks(parameter_sets: List[List[Dict]]):
+        """Yield parameter sets in chunks under BATCH_MAX_ROWS / BATCH_MAX_BYTES"""
+        chunk, size = [], 0
+        for params in parameter_sets:
+            params_size = len(_dumps(params))
+            if chunk and (len(chunk) >= BATCH_MAX_ROWS or size + params_size > BATCH_MAX_BYTES):
+                yield chunk
+                chunk, size = [], 0
+            chunk.append(params)
+            size += params_size
+        if chunk:
+            yield chunk
+
     def update(self, table: str, data: Dict, where: str, where_params: Dict = None) -> int:
         """
         Update records in a table
@@ -187,27 +497,17 @@ class DataAPIClient:
         Returns:
             Number of affected rows
         """
-        # Build SET clause with type casting where needed
-        set_parts = []
-        for col, val in data.items():
-            if isinstance(val, (dict, list)):
-                set_parts.append(f"{col} = :{col}::jsonb")
-            elif isinstance(val, Decimal):
-                set_parts.append(f"{col} = :{col}::numeric")
-            elif isinstance(val, date) and not isinstance(val, datetime):
-                set_parts.append(f"{col} = :{col}::date")
-            elif isinstance(val, datetime):
-                set_parts.append(f"{col} = :{col}::timestamp")
-            else:
-                set_parts.append(f"{col} = :{col}")
+        # Build SET clause with type casting where needed. Columns are sorted and
+        # the statement kept on one line so same-shape updates send identical SQL
+        jsonb_columns = _JSONB_COLUMNS.get(table, _NO_COLUMNS)
+        uuid_columns = _UUID_COLUMNS.get(table, _NO_COLUMNS)
+        set_parts = [
+            f"{col} = {_typed_placeholder(col, data[col], jsonb_columns, uuid_columns)}" for col in sorted(data)
+        ]
 
         set_clause = ", ".join(set_parts)
 
-        sql = f"""
-            UPDATE {table}
-            SET {set_clause}
-            WHERE {where}
-        """
+        sql = f"UPDATE {table} SET {set_clause} WHERE {where}"
 
         # Combine data and where parameters
         all_params = {**data, **(where_params or {})}
@@ -216,6 +516,40 @@ class DataAPIClient:
         response = self.execute(sql, parameters)
         return response.get("numberOfRecordsUpdated", 0)
 
+    def bulk_update(self, table: str, rows: List[Dict], key_columns: List[str]):
+        """
+        Update many records by key with BatchExecuteStatement
+
+        All rows must have the same columns; every column not in key_columns
+        is set, and key_columns select the row. The SQL is built once from the
+        first row. BatchExecuteStatement does not report affected-row counts,
+        so nothing is returned.
+
+        Args:
+            table: Table name
+            rows: List of dictionaries holding key and updated columns
+            key_columns: Columns matched in the WHERE clause (e.g., ['id'])
+        """
+        if not rows:
+            return
+
+        first = rows[0]
+        jsonb_columns = _JSONB_COLUMNS.get(table, _NO_COLUMNS)
+        uuid_columns = _UUID_COLUMNS.get(table, _NO_COLUMNS)
+        set_clause = ", ".join(
+            f"{col} = {_typed_placeholder(col, val, jsonb_columns, uuid_columns)}"
+            for col, val in sorted(first.items())
+            if col not in key_columns
+        )
+        where = " AND ".join(
+            f"{col} = {_typed_placeholder(col, first[col], uuid_columns=uuid_columns)}" for col in key_columns
+        )
+
+        sql = f"UPDATE {table} SET {set_clause} WHERE {where}"
+
+        for chunk in self._batch_chunks([self._build_parameters(row) for row in rows]):
+            self.batch_execute(sql, chunk)
+
     def delete(self, table: str, where: str, where_params: Dict = None) -> int:
         """
         Delete records from a table
@@ -234,6 +568,29 @@ class DataAPIClient:
         response = self.execute(sql, parameters)
         return response.get("numberOfRecordsUpdated", 0)
 
+    def warm(self) -> bool:
+        """
+        Resolve credentials and wake the cluster ahead of the first real query
+
+        Uses a one-attempt client with short timeouts (WARM_CONFIG) so a slow
+        or unreachable cluster cannot stall a cold start.
+
+        Returns:
+            True if the round trip succeeded; failures are logged, not raised
+        """
+        try:
+            warm_client = boto3.client("rds-data", region_name=self.region, config=WARM_CONFIG)
+            warm_client.execute_statement(
+                resourceArn=self.cluster_arn,
+                secretArn=self.secret_arn,
+                database=self.database,
+                sql="SELECT 1",
+            )
+            return True
+        except (ClientError, BotoCoreError) as e:
+            logger.warning("Database warm-up failed: %s", e)
+            return False
+
     def begin_transaction(self) -> str:
         """Begin a database transaction"""
         response = self.client.begin_transaction(
@@ -258,53 +615,8 @@ class DataAPIClient:
         if not data:
             return []
 
-        parameters = []
-        for key, value in data.items():
-            param = {"name": key}
-
-            if value is None:
-                param["value"] = {"isNull": True}
-            elif isinstance(value, bool):
-                param["value"] = {"booleanValue": value}
-            elif isinstance(value, int):
-                param["value"] = {"longValue": value}
-            elif isinstance(value, float):
-                param["value"] = {"doubleValue": value}
-            elif isinstance(value, Decimal):
-                param["value"] = {"stringValue": str(value)}
-            elif isinstance(value, (date, datetime)):
-                param["value"] = {"stringValue": value.isoformat()}
-            elif isinstance(value, dict):
-                param["value"] = {"stringValue": json.dumps(value)}
-            elif isinstance(value, list):
-                param["value"] = {"stringValue": json.dumps(value)}
-            else:
-                param["value"] = {"stringValue": str(value)}
-
-            parameters.append(param)
-
-        return parameters
+        return [{"name": key, "value": _encode_value(value)} for key, value in data.items()]
 
     def _extract_value(self, field: Dict) -> Any:
         """Extract value from Data API field response"""
-        if field.get("isNull"):
-            return None
-        elif "booleanValue" in field:
-            return field["booleanValue"]
-        elif "longValue" in field:
-            return field["longValue"]
-        elif "doubleValue" in field:
-            return field["doubleValue"]
-        elif "stringValue" in field:
-            value = field["stringValue"]
-            # Try to parse JSON if it looks like JSON
-            if value and value[0] in ["{", "["]:
-                try:
-                    return json.loads(value)
-                except json.JSONDecodeError:
-                    pass
-            return value
-        elif "blobValue" in field:
-            return field["blobValue"]
-        else:
-            return None
+        return _field_value(field)
@@ -59,10 +59,18 @@ class Users(BaseModel):
         params = [{'name': 'clerk_id', 'value': {'stringValue': clerk_user_id}}]
         return self.db.query_one(sql, params)
     
+    def exists(self, clerk_user_id: str) -> bool:
+        """Check whether a user exists without fetching the row"""
+        sql = f"SELECT EXISTS(SELECT 1 FROM {self.table_name} WHERE clerk_user_id = :clerk_id) AS present"
+        params = [{'name': 'clerk_id', 'value': {'stringValue': clerk_user_id}}]
+        result = self.db.query_one(sql, params)
+        return bool(result and result['present'])
+    
     def create_user(self, clerk_user_id: str, display_name: str = None, 
                    years_until_retirement: int = None,
-                   target_retirement_income: Decimal = None) -> str:
-        """Create a new user"""
+                   target_retirement_income: Decimal = None,
+                   if_not_exists: bool = False) -> Optional[str]:
+        """Create a new user (with if_not_exists, returns None if the user was already there)"""
         data = {
             'clerk_user_id': clerk_user_id,
             'display_name': display_name,
@@ -71,7 +79,8 @@ class Users(BaseModel):
         }
         # Remove None values
         data = {k: v for k, v in data.items() if v is not None}
-        return self.db.insert(self.table_name, data, returning='clerk_user_id')
+        on_conflict = '(clerk_user_id) DO NOTHING' if if_not_exists else None
+        return self.db.insert(self.table_name, data, returning='clerk_user_id', on_conflict=on_conflict)
 
 
 class Instruments(BaseModel):
@@ -89,6 +98,24 @@ class Instruments(BaseModel):
         params = [{'name': 'symbol', 'value': {'stringValue': symbol}}]
         return self.db.query_one(sql, params)
     
+    def find_by_symbols(self, symbols: List[str], columns: str = '*') -> Dict[str, Dict]:
+        """Find several instruments in one query, keyed by symbol (columns must include symbol)"""
+        unique = list(dict.fromkeys(symbols))
+        if not unique:
+            return {}
+        # Data API has no array parameters, so bind one placeholder per symbol
+        placeholders = ", ".join(f":s{i}" for i in range(len(unique)))
+        sql = f"SELECT {columns} FROM {self.table_name} WHERE symbol IN ({placeholders})"
+        params = [{'name': f's{i}', 'value': {'stringValue': symbol}} for i, symbol in enumerate(unique)]
+        return {row['symbol']: row for row in self.db.query_iter(sql, params)}
+    
+    def exists(self, symbol: str) -> bool:
+        """Check whether an instrument exists without fetching its allocations"""
+        sql = f"SELECT EXISTS(SELECT 1 FROM {self.table_name} WHERE symbol = :symbol) AS present"
+        params = [{'name': 'symbol', 'value': {'stringValue': symbol}}]
+        result = self.db.query_one(sql, params)
+        return bool(result and result['present'])
+    
     def create_instrument(self, instrument: InstrumentCreate) -> str:
         """Create a new instrument with validation"""
         # Validate using Pydantic
@@ -141,8 +168,8 @@ class Accounts(BaseModel):
     
     def create_account(self, clerk_user_id: str, account_name: str,
                       account_purpose: str = None, cash_balance: Decimal = Decimal('0'),
-                      cash_interest: Decimal = Decimal('0')) -> str:
-        """Create a new account"""
+                      cash_interest: Decimal = Decimal('0'), returning: str = 'id') -> Any:
+        """Create a new account (returning='*' gives back the whole row)"""
         data = {
             'clerk_user_id': clerk_user_id,
             'account_name': account_name,
@@ -150,7 +177,21 @@ class Accounts(BaseModel):
             'cash_balance': cash_balance,
             'cash_interest': cash_interest
         }
-        return self.db.insert(self.table_name, data, returning='id')
+        return self.db.insert(self.table_name, data, returning=returning)
+    
+    def create_accounts(self, clerk_user_id: str, accounts: List[Dict]) -> List[str]:
+        """Create several accounts for a user in one batch, returning their IDs in order"""
+        rows = [
+            {
+                'clerk_user_id': clerk_user_id,
+                'account_name': account['account_name'],
+                'account_purpose': account.get('account_purpose'),
+                'cash_balance': account.get('cash_balance', Decimal('0')),
+                'cash_interest': account.get('cash_interest', Decimal('0'))
+            }
+            for account in accounts
+        ]
+        return self.db.bulk_insert(self.table_name, rows, returning='id')
 
 
 class Positions(BaseModel):
@@ -192,29 +233,42 @@ class Positions(BaseModel):
             }
         return {'num_positions': 0, 'total_value': 0, 'total_shares': 0}
     
-    def add_position(self, account_id: str, symbol: str, quantity: Decimal) -> str:
-        """Add or update a position"""
-        # Use UPSERT to handle existing positions
-        sql = """
-            INSERT INTO positions (account_id, symbol, quantity, as_of_date)
-            VALUES (:account_id::uuid, :symbol, :quantity::numeric, :as_of_date::date)
-            ON CONFLICT (account_id, symbol) 
-            DO UPDATE SET 
-                quantity = EXCLUDED.quantity,
-                as_of_date = EXCLUDED.as_of_date,
-                updated_at = NOW()
-            RETURNING id
-        """
-        params = [
+    # UPSERT so adding an existing position updates it
+    UPSERT_SQL = """
+        INSERT INTO positions (account_id, symbol, quantity, as_of_date)
+        VALUES (:account_id::uuid, :symbol, :quantity::numeric, :as_of_date::date)
+        ON CONFLICT (account_id, symbol) 
+        DO UPDATE SET 
+            quantity = EXCLUDED.quantity,
+            as_of_date = EXCLUDED.as_of_date,
+            updated_at = NOW()
+        RETURNING id
+    """
+    
+    @staticmethod
+    def _upsert_params(account_id: str, symbol: str, quantity: Decimal) -> List[Dict]:
+        return [
             {'name': 'account_id', 'value': {'stringValue': account_id}},
             {'name': 'symbol', 'value': {'stringValue': symbol}},
             {'name': 'quantity', 'value': {'stringValue': str(quantity)}},
             {'name': 'as_of_date', 'value': {'stringValue': date.today().isoformat()}}
         ]
-        response = self.db.execute(sql, params)
+    
+    def add_position(self, account_id: str, symbol: str, quantity: Decimal) -> str:
+        """Add or update a position"""
+        response = self.db.execute(self.UPSERT_SQL, self._upsert_params(account_id, symbol, quantity))
         if response.get('records'):
             return response['records'][0][0].get('stringValue')
         return None
+    
+    def add_positions(self, account_id: str, holdings: List[tuple]) -> None:
+        """Add or update several (symbol, quantity) positions in one batch"""
+        if not holdings:
+            return
+        self.db.batch_execute(
+            self.UPSERT_SQL,
+            [self._upsert_params(account_id, symbol, quantity) for symbol, quantity in holdings]
+        )
 
 
 class Jobs(BaseModel):
@@ -266,6 +320,19 @@ class Jobs(BaseModel):
         data = {'summary_payload': summary_payload}
         return self.db.update(self.table_name, data, "id = :id::uuid", {'id': job_id})
     
+    def find_status(self, job_id: str) -> Optional[Dict]:
+        """Find a job's status and which payloads are set, without fetching the payloads"""
+        sql = f"""
+            SELECT status, error_message,
+                   report_payload IS NOT NULL AS has_report,
+                   charts_payload IS NOT NULL AS has_charts,
+                   retirement_payload IS NOT NULL AS has_retirement,
+                   summary_payload IS NOT NULL AS has_summary
+            FROM {self.table_name}
+            WHERE id = :id::uuid
+        """
+        return self.db.query_one(sql, [{'name': 'id', 'value': {'stringValue': str(job_id)}}])
+    
     def find_by_user(self, clerk_user_id: str, status: str = None, 
                     limit: int = 20) -> List[Dict]:
         """Find jobs for a user"""
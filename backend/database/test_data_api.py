@@ -8,29 +8,40 @@ import boto3
 import json
 import os
 import sys
+from functools import lru_cache
 from botocore.exceptions import ClientError
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv(override=True)
 
+# Read configuration once, like the other database scripts
+ENV_CLUSTER_ARN = os.environ.get('AURORA_CLUSTER_ARN')
+ENV_SECRET_ARN = os.environ.get('AURORA_SECRET_ARN')
+DEFAULT_REGION = os.environ.get('DEFAULT_AWS_REGION', 'us-east-1')
+
+@lru_cache(maxsize=None)
+def get_session():
+    """One boto3 session for the whole run, so credentials are resolved once"""
+    return boto3.Session()
+
 def get_current_region():
     """Get the current AWS region from the session"""
-    session = boto3.Session()
-    return session.region_name or os.getenv('DEFAULT_AWS_REGION', 'us-east-1')
+    session = get_session()
+    return session.region_name or DEFAULT_REGION
 
 def get_cluster_details(region):
     """Get Aurora cluster ARN and secret ARN from environment variables or verify they exist"""
     
     # First try to get from environment variables
-    cluster_arn = os.getenv('AURORA_CLUSTER_ARN')
-    secret_arn = os.getenv('AURORA_SECRET_ARN')
+    cluster_arn = ENV_CLUSTER_ARN
+    secret_arn = ENV_SECRET_ARN
     
     if cluster_arn and secret_arn:
         print(f"📋 Using configuration from .env file")
         
         # Verify the cluster exists and Data API is enabled
-        rds_client = boto3.client('rds', region_name=region)
+        rds_client = get_session().client('rds', region_name=region)
         try:
             cluster_id = cluster_arn.split(':')[-1]
             response = rds_client.describe_db_clusters(
@@ -60,8 +71,8 @@ def get_cluster_details(region):
     print("   AURORA_SECRET_ARN=<your-secret-arn>")
     print("\nAttempting to auto-discover Aurora resources...")
     
-    rds_client = boto3.client('rds', region_name=region)
-    secrets_client = boto3.client('secretsmanager', region_name=region)
+    rds_client = get_session().client('rds', region_name=region)
+    secrets_client = get_session().client('secretsmanager', region_name=region)
     
     try:
         # Get cluster ARN
@@ -111,7 +122,7 @@ def get_cluster_details(region):
 
 def test_data_api(cluster_arn, secret_arn, region):
     """Test the Data API connection"""
-    client = boto3.client('rds-data', region_name=region)
+    client = get_session().client('rds-data', region_name=region)
     
     print(f"\n🔍 Testing Data API Connection")
     print(f"   Region: {region}")
@@ -119,19 +130,35 @@ def test_data_api(cluster_arn, secret_arn, region):
     print(f"   Secret ARN: {secret_arn}")
     print("-" * 50)
     
-    # Test 1: Simple SELECT
+    # Tests 1-3 share one round trip: the probe row, the database size and one
+    # row per table, told apart by the kind column
     print("\n1️⃣ Testing basic SELECT...")
     try:
         response = client.execute_statement(
             resourceArn=cluster_arn,
             secretArn=secret_arn,
             database='alex',
-            sql='SELECT 1 as test_connection, current_timestamp as server_time'
+            sql="""
+                SELECT 'probe' AS kind, current_timestamp::text AS value
+                UNION ALL
+                SELECT 'size', pg_database_size('alex')::text
+                UNION ALL
+                SELECT 'table', table_name::text
+                FROM information_schema.tables
+                WHERE table_schema = 'public'
+            """
         )
         
-        if response['records']:
-            test_val = response['records'][0][0].get('longValue')
-            server_time = response['records'][0][1].get('stringValue')
+        records = response.get('records', ())
+        rows_by_kind = {}
+        for kind, value in records:
+            # Each Data API field has exactly one typed key
+            rows_by_kind.setdefault(next(iter(kind.values())), []).append(next(iter(value.values())))
+        server_time = rows_by_kind.get('probe', [None])[0]
+        size_bytes = rows_by_kind.get('size', [None])[0]
+        tables = sorted(rows_by_kind.get('table', []))
+        
+        if server_time:
             print(f"   ✅ Connection successful!")
             print(f"   Server time: {server_time}")
         else:
@@ -160,51 +187,20 @@ def test_data_api(cluster_arn, secret_arn, region):
             print(f"   ❌ Error: {e}")
         return False
     
-    # Test 2: Check for tables
+    # Test 2: Check for tables (fetched with the probe above)
     print("\n2️⃣ Checking for existing tables...")
-    try:
-        response = client.execute_statement(
-            resourceArn=cluster_arn,
-            secretArn=secret_arn,
-            database='alex',
-            sql="""
-                SELECT table_name 
-                FROM information_schema.tables 
-                WHERE table_schema = 'public' 
-                ORDER BY table_name
-            """
-        )
-        
-        tables = [record[0].get('stringValue') for record in response.get('records', [])]
-        
-        if tables:
-            print(f"   ✅ Found {len(tables)} tables:")
-            for table in tables:
-                print(f"      - {table}")
-        else:
-            print("   ℹ️  No tables found (database is empty)")
-            print("   💡 Run the migration script to create tables")
-            
-    except ClientError as e:
-        print(f"   ⚠️  Could not list tables: {e}")
-    
-    # Test 3: Check database size
+    if tables:
+        print(f"   ✅ Found {len(tables)} tables:")
+        print("\n".join(f"      - {table}" for table in tables))
+    else:
+        print("   ℹ️  No tables found (database is empty)")
+        print("   💡 Run the migration script to create tables")
+    
+    # Test 3: Check database size (fetched with the probe above)
     print("\n3️⃣ Checking database info...")
-    try:
-        response = client.execute_statement(
-            resourceArn=cluster_arn,
-            secretArn=secret_arn,
-            database='alex',
-            sql="SELECT pg_database_size('alex') as size_bytes"
-        )
-        
-        if response['records']:
-            size_bytes = response['records'][0][0].get('longValue', 0)
-            size_mb = size_bytes / (1024 * 1024)
-            print(f"   ✅ Database size: {size_mb:.2f} MB")
-            
-    except:
-        pass
+    if size_bytes is not None:
+        size_mb = int(size_bytes) / (1024 * 1024)
+        print(f"   ✅ Database size: {size_mb:.2f} MB")
     
     print("\n" + "=" * 50)
     print("✅ Data API is working correctly!")
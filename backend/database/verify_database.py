@@ -14,204 +14,263 @@ This script verifies:
 Note: JSONB values are stored as floats (100.0) not strings ('100')
 """
 
+import io
 import os
-import boto3
-import json
-from pathlib import Path
-from botocore.exceptions import ClientError
+import sys
+from contextlib import redirect_stdout
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv(override=True)
 
 # Get config from environment
-cluster_arn = os.environ.get('AURORA_CLUSTER_ARN')
-secret_arn = os.environ.get('AURORA_SECRET_ARN')
+REQUIRED_ENV = ('AURORA_CLUSTER_ARN', 'AURORA_SECRET_ARN')
+missing = [name for name in REQUIRED_ENV if not os.environ.get(name)]
+if missing:
+    # Fail before paying for the boto3 import below
+    print(f"❌ Missing {' or '.join(missing)} in .env file")
+    exit(1)
+
+cluster_arn = os.environ['AURORA_CLUSTER_ARN']
+secret_arn = os.environ['AURORA_SECRET_ARN']
 database = os.environ.get('AURORA_DATABASE', 'alex')
 region = os.environ.get('AWS_REGION', 'us-east-1')
 
-if not cluster_arn or not secret_arn:
-    print("❌ Missing AURORA_CLUSTER_ARN or AURORA_SECRET_ARN in .env file")
-    exit(1)
+# Imported after the env check on purpose, so a misconfigured run exits first
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
 
-client = boto3.client('rds-data', region_name=region)
+# Keep-alive so the fallback per-section queries reuse one HTTPS connection
+client = boto3.client(
+    'rds-data',
+    region_name=region,
+    config=Config(
+        max_pool_connections=1,
+        tcp_keepalive=True,
+        retries={'mode': 'standard', 'max_attempts': 2},
+    ),
+)
 
-def execute_query(sql, description):
-    """Execute a query and return results"""
-    print(f"\n{description}")
-    print("-" * 50)
-    
+# Every report section is one query with the same column shape:
+# (sort_key, c1 .. c6), all text, unused columns NULL. fetch_sections() sends them as a
+# single UNION ALL so the whole report costs one Data API round trip.
+SECTIONS = {
+    'tables': """
+        SELECT c.relname::text AS sort_key, c.relname::text AS c1,
+               pg_size_pretty(pg_total_relation_size(c.oid)) AS c2,
+               NULL::text AS c3, NULL::text AS c4, NULL::text AS c5, NULL::text AS c6
+        FROM pg_class c
+        WHERE c.relnamespace = 'public'::regnamespace
+        AND c.relkind IN ('r', 'p')
+    """,
+    'counts': """
+        SELECT t.table_name AS sort_key, t.table_name AS c1, t.count::text AS c2,
+               'false'::text AS c3, NULL::text AS c4, NULL::text AS c5, NULL::text AS c6
+        FROM (
+            SELECT 'users' AS table_name, COUNT(*) AS count FROM users
+            UNION ALL
+            SELECT 'instruments', COUNT(*) FROM instruments
+            UNION ALL
+            SELECT 'accounts', COUNT(*) FROM accounts
+            UNION ALL
+            SELECT 'positions', COUNT(*) FROM positions
+            UNION ALL
+            SELECT 'jobs', COUNT(*) FROM jobs
+        ) t
+    """,
+    'samples': """
+        SELECT symbol::text AS sort_key, symbol::text AS c1, name::text AS c2,
+               instrument_type::text AS c3, allocation_asset_class::text AS c4,
+               NULL::text AS c5, NULL::text AS c6
+        FROM (SELECT * FROM instruments ORDER BY symbol LIMIT 10) i
+    """,
+    'allocations': """
+        SELECT symbol AS sort_key, symbol AS c1,
+               regions_sum::text AS c2, sectors_sum::text AS c3, asset_sum::text AS c4,
+               (COALESCE(regions_sum = 100 AND sectors_sum = 100 AND asset_sum = 100, false))::text AS c5,
+               NULL::text AS c6
+        FROM (
+            SELECT symbol::text AS symbol,
+                   (SELECT SUM(value::numeric) FROM jsonb_each_text(allocation_regions)) AS regions_sum,
+                   (SELECT SUM(value::numeric) FROM jsonb_each_text(allocation_sectors)) AS sectors_sum,
+                   (SELECT SUM(value::numeric) FROM jsonb_each_text(allocation_asset_class)) AS asset_sum
+            FROM instruments
+            WHERE symbol IN ('SPY', 'QQQ', 'BND', 'VEA', 'GLD')
+        ) sums
+    """,
+    'distribution': """
+        SELECT ''::text AS sort_key,
+            (COUNT(*) FILTER (WHERE (allocation_asset_class->>'equity')::numeric = 100))::text AS c1,
+            (COUNT(*) FILTER (WHERE (allocation_asset_class->>'fixed_income')::numeric = 100))::text AS c2,
+            (COUNT(*) FILTER (WHERE (allocation_asset_class->>'real_estate')::numeric = 100))::text AS c3,
+            (COUNT(*) FILTER (WHERE (allocation_asset_class->>'commodities')::numeric = 100))::text AS c4,
+            (COUNT(*) FILTER (WHERE jsonb_typeof(allocation_asset_class) = 'object' 
+                            AND (SELECT COUNT(*) FROM jsonb_object_keys(allocation_asset_class)) > 1))::text AS c5,
+            COUNT(*)::text AS c6
+        FROM instruments
+    """,
+    'indexes': """
+        SELECT t.relname::text || '.' || c.relname::text AS sort_key, c.relname::text AS c1,
+               NULL::text AS c2, NULL::text AS c3, NULL::text AS c4, NULL::text AS c5, NULL::text AS c6
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        JOIN pg_class t ON t.oid = i.indrelid
+        WHERE c.relnamespace = 'public'::regnamespace
+        AND c.relname LIKE 'idx_%'
+    """,
+    'triggers': """
+        SELECT c.relname::text AS sort_key, t.tgname::text AS c1,
+               NULL::text AS c2, NULL::text AS c3, NULL::text AS c4, NULL::text AS c5, NULL::text AS c6
+        FROM pg_trigger t
+        JOIN pg_class c ON c.oid = t.tgrelid
+        WHERE c.relnamespace = 'public'::regnamespace
+        AND NOT t.tgisinternal
+    """,
+}
+
+# Planner statistics are enough for a "does data exist" check, so by default
+# only instruments (whose count the report checks) is counted exactly. Pass
+# --exact to count every table.
+ESTIMATED_COUNTS_SQL = """
+    SELECT c.relname::text AS sort_key, c.relname::text AS c1,
+           CASE WHEN c.relname = 'instruments' THEN (SELECT COUNT(*) FROM instruments)
+                ELSE GREATEST(c.reltuples, 0)::bigint END::text AS c2,
+           (c.relname <> 'instruments')::text AS c3,
+           NULL::text AS c4, NULL::text AS c5, NULL::text AS c6
+    FROM pg_class c
+    WHERE c.relnamespace = current_schema()::regnamespace
+    AND c.relkind = 'r'
+    AND c.relname IN ('users', 'instruments', 'accounts', 'positions', 'jobs')
+"""
+if '--exact' not in sys.argv[1:]:
+    SECTIONS['counts'] = ESTIMATED_COUNTS_SQL
+
+# Final SQL text, built once: each section tagged with its name, plus the
+# combined report query
+SECTION_SQL = {
+    name: f"SELECT '{name}' AS section, s.* FROM ({sql}) s"
+    for name, sql in SECTIONS.items()
+}
+REPORT_SQL = " UNION ALL ".join(SECTION_SQL.values()) + " ORDER BY section, sort_key"
+
+def field_value(field):
+    """Value of a Data API field (None for SQL NULL)"""
+    return None if field.get('isNull') else next(iter(field.values()))
+
+def run_sql(sql):
+    """Execute one statement, returning (records, error message)"""
     try:
         response = client.execute_statement(
             resourceArn=cluster_arn,
             secretArn=secret_arn,
             database=database,
-            sql=sql
+            sql=sql,
+            # Rows are read positionally, so skip the per-column metadata
+            includeResultMetadata=False
         )
-        return response
+        return response.get('records', []), None
     except ClientError as e:
-        print(f"❌ Error: {e.response['Error']['Message']}")
+        return None, e.response['Error']['Message']
+
+def fetch_sections():
+    """
+    Fetch every section, keyed by name, as lists of [c1 .. c6] rows.
+
+    All sections go in one query. If that fails (say a table is missing),
+    each section is retried alone so only the broken ones report an error.
+    Failed sections map to their error message instead of a list.
+    """
+    records, error = run_sql(REPORT_SQL)
+    if error is None:
+        results = {name: [] for name in SECTIONS}
+        for record in records:
+            values = [field_value(field) for field in record]
+            results[values[0]].append(values[2:])
+        return results
+
+    results = {}
+    for name in SECTIONS:
+        records, error = run_sql(f"{SECTION_SQL[name]} ORDER BY sort_key")
+        results[name] = error if error else [[field_value(f) for f in record][2:] for record in records]
+    return results
+
+def show_section(results, name, description):
+    """Print a section header and return its rows (None if its query failed)"""
+    print(f"\n{description}")
+    print("-" * 50)
+    rows = results[name]
+    if isinstance(rows, str):
+        print(f"❌ Error: {rows}")
         return None
+    return rows
 
-def main():
+def print_report():
     print("🔍 DATABASE VERIFICATION REPORT")
     print("=" * 70)
-    print(f"📍 Region: {config['region']}")
-    print(f"📦 Database: {config['database']}")
+    print(f"📍 Region: {region}")
+    print(f"📦 Database: {database}")
     print("=" * 70)
     
-    # 1. Show all tables
-    response = execute_query(
-        """
-        SELECT table_name, 
-               pg_size_pretty(pg_total_relation_size(quote_ident(table_name)::regclass)) as size
-        FROM information_schema.tables 
-        WHERE table_schema = 'public' 
-        AND table_type = 'BASE TABLE'
-        ORDER BY table_name
-        """,
-        "📊 ALL TABLES IN DATABASE"
-    )
+    results = fetch_sections()
     
-    if response and response['records']:
-        print(f"✅ Found {len(response['records'])} tables:\n")
-        for record in response['records']:
-            table_name = record[0]['stringValue']
-            size = record[1]['stringValue']
+    # 1. Show all tables
+    rows = show_section(results, 'tables', "📊 ALL TABLES IN DATABASE")
+    if rows:
+        print(f"✅ Found {len(rows)} tables:\n")
+        for table_name, size, *_ in rows:
             print(f"   • {table_name:<20} Size: {size}")
     
     # 2. Count records in each table
-    response = execute_query(
-        """
-        SELECT 
-            'users' as table_name, COUNT(*) as count FROM users
-        UNION ALL
-        SELECT 'instruments', COUNT(*) FROM instruments
-        UNION ALL
-        SELECT 'accounts', COUNT(*) FROM accounts
-        UNION ALL
-        SELECT 'positions', COUNT(*) FROM positions
-        UNION ALL
-        SELECT 'jobs', COUNT(*) FROM jobs
-        ORDER BY table_name
-        """,
-        "📈 RECORD COUNTS PER TABLE"
-    )
-    
-    if response and response['records']:
+    rows = show_section(results, 'counts', "📈 RECORD COUNTS PER TABLE")
+    if rows:
         print("\nTable record counts:\n")
-        for record in response['records']:
-            table_name = record[0]['stringValue']
-            count = record[1]['longValue']
+        for table_name, count, estimated, *_ in rows:
+            count = int(count)
             status = "✅" if (table_name == 'instruments' and count > 0) else "📭"
-            print(f"   {status} {table_name:<20} {count:,} records")
+            note = " (estimated)" if estimated == 'true' else ""
+            print(f"   {status} {table_name:<20} {count:,} records{note}")
     
     # 3. Show instruments with allocation data
-    response = execute_query(
-        """
-        SELECT symbol, name, instrument_type,
-               allocation_asset_class::text as asset_class
-        FROM instruments 
-        ORDER BY symbol 
-        LIMIT 10
-        """,
-        "🎯 SAMPLE INSTRUMENTS (First 10)"
-    )
-    
-    if response and response['records']:
+    rows = show_section(results, 'samples', "🎯 SAMPLE INSTRUMENTS (First 10)")
+    if rows:
         print("\nSymbol | Name | Type | Asset Class Allocation")
         print("-" * 70)
-        for record in response['records']:
-            symbol = record[0]['stringValue']
-            name = record[1]['stringValue'][:35]
-            inst_type = record[2]['stringValue']
-            asset_class = record[3]['stringValue']
-            print(f"{symbol:<6} | {name:<35} | {inst_type:<10} | {asset_class}")
+        for symbol, name, inst_type, asset_class, *_ in rows:
+            print(f"{symbol:<6} | {name[:35]:<35} | {inst_type:<10} | {asset_class}")
     
     # 4. Verify allocation sums
-    response = execute_query(
-        """
-        SELECT symbol,
-               (SELECT SUM(value::numeric) FROM jsonb_each_text(allocation_regions)) as regions_sum,
-               (SELECT SUM(value::numeric) FROM jsonb_each_text(allocation_sectors)) as sectors_sum,
-               (SELECT SUM(value::numeric) FROM jsonb_each_text(allocation_asset_class)) as asset_sum
-        FROM instruments
-        WHERE symbol IN ('SPY', 'QQQ', 'BND', 'VEA', 'GLD')
-        """,
-        "✅ ALLOCATION VALIDATION (Sample ETFs)"
-    )
-    
-    if response and response['records']:
+    rows = show_section(results, 'allocations', "✅ ALLOCATION VALIDATION (Sample ETFs)")
+    if rows:
         print("\nVerifying allocations sum to 100%:\n")
         print("Symbol | Regions | Sectors | Assets | Status")
         print("-" * 50)
-        for record in response['records']:
-            symbol = record[0]['stringValue']
-            # Handle numeric values from SUM()
-            regions = float(record[1].get('stringValue', '0')) if record[1] and 'stringValue' in record[1] else 0
-            sectors = float(record[2].get('stringValue', '0')) if record[2] and 'stringValue' in record[2] else 0
-            assets = float(record[3].get('stringValue', '0')) if record[3] and 'stringValue' in record[3] else 0
-            
-            all_valid = regions == 100 and sectors == 100 and assets == 100
-            status = "✅ Valid" if all_valid else "❌ Invalid"
-            
-            print(f"{symbol:<6} | {regions:>7}% | {sectors:>7}% | {assets:>6}% | {status}")
+        for symbol, regions, sectors, assets, valid, _ in rows:
+            status = "✅ Valid" if valid == 'true' else "❌ Invalid"
+            print(f"{symbol:<6} | {float(regions or 0):>7}% | {float(sectors or 0):>7}% | {float(assets or 0):>6}% | {status}")
     
     # 5. Show asset class distribution
-    response = execute_query(
-        """
-        SELECT 
-            COUNT(*) FILTER (WHERE (allocation_asset_class->>'equity')::numeric = 100) as pure_equity,
-            COUNT(*) FILTER (WHERE (allocation_asset_class->>'fixed_income')::numeric = 100) as pure_bonds,
-            COUNT(*) FILTER (WHERE (allocation_asset_class->>'real_estate')::numeric = 100) as real_estate,
-            COUNT(*) FILTER (WHERE (allocation_asset_class->>'commodities')::numeric = 100) as commodities,
-            COUNT(*) FILTER (WHERE jsonb_typeof(allocation_asset_class) = 'object' 
-                            AND (SELECT COUNT(*) FROM jsonb_object_keys(allocation_asset_class)) > 1) as mixed,
-            COUNT(*) as total
-        FROM instruments
-        """,
-        "📊 ASSET CLASS DISTRIBUTION"
-    )
-    
-    if response and response['records']:
-        record = response['records'][0]
+    rows = show_section(results, 'distribution', "📊 ASSET CLASS DISTRIBUTION")
+    if rows:
+        equity, bonds, real_estate, commodities, mixed, total = (int(v) for v in rows[0])
         print("\nInstrument breakdown by asset class:\n")
-        print(f"   • Pure Equity ETFs:      {record[0]['longValue']:>3}")
-        print(f"   • Pure Bond Funds:       {record[1]['longValue']:>3}")
-        print(f"   • Real Estate ETFs:      {record[2]['longValue']:>3}")
-        print(f"   • Commodity ETFs:        {record[3]['longValue']:>3}")
-        print(f"   • Mixed Allocation ETFs: {record[4]['longValue']:>3}")
+        print(f"   • Pure Equity ETFs:      {equity:>3}")
+        print(f"   • Pure Bond Funds:       {bonds:>3}")
+        print(f"   • Real Estate ETFs:      {real_estate:>3}")
+        print(f"   • Commodity ETFs:        {commodities:>3}")
+        print(f"   • Mixed Allocation ETFs: {mixed:>3}")
         print(f"   " + "-" * 25)
-        print(f"   • TOTAL INSTRUMENTS:     {record[5]['longValue']:>3}")
+        print(f"   • TOTAL INSTRUMENTS:     {total:>3}")
     
     # 6. Check indexes exist
-    response = execute_query(
-        """
-        SELECT schemaname, tablename, indexname
-        FROM pg_indexes
-        WHERE schemaname = 'public'
-        AND indexname LIKE 'idx_%'
-        ORDER BY tablename, indexname
-        """,
-        "🔍 DATABASE INDEXES"
-    )
-    
-    if response and response['records']:
-        print(f"\n✅ Found {len(response['records'])} custom indexes")
+    rows = show_section(results, 'indexes', "🔍 DATABASE INDEXES")
+    if rows:
+        print(f"\n✅ Found {len(rows)} custom indexes")
     
     # 7. Check triggers exist
-    response = execute_query(
-        """
-        SELECT trigger_name, event_object_table
-        FROM information_schema.triggers
-        WHERE trigger_schema = 'public'
-        ORDER BY event_object_table
-        """,
-        "⚡ DATABASE TRIGGERS"
-    )
-    
-    if response and response['records']:
-        print(f"\n✅ Found {len(response['records'])} update triggers for timestamp management")
+    rows = show_section(results, 'triggers', "⚡ DATABASE TRIGGERS")
+    if rows:
+        print(f"\n✅ Found {len(rows)} update triggers for timestamp management")
     
     # Final summary
     print("\n" + "=" * 70)
@@ -223,5 +282,16 @@ def main():
     print("✅ Indexes and triggers are in place")
     print("✅ Database is ready for Part 6: Agent Orchestra!")
 
+def main():
+    # Collect the report and write it to stdout in one go instead of one
+    # write per line; whatever was gathered is still written if a step raises
+    buffer = io.StringIO()
+    try:
+        with redirect_stdout(buffer):
+            print_report()
+    finally:
+        sys.stdout.write(buffer.getvalue())
+        sys.stdout.flush()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -83,26 +83,22 @@ def update_prices_for_symbols(symbols: Set[str], db) -> None:
 
     logger.info(f"Market: Retrieved prices for {len(price_map)}/{len(symbols_list)} symbols")
 
-    # Update database with fetched prices
-    for symbol, price in price_map.items():
-        try:
-            instrument = db.instruments.find_by_symbol(symbol)
-            if instrument:
-                update_data = {'current_price': price}
-                success = db.client.update(
-                    'instruments',
-                    update_data,
-                    "symbol = :symbol",
-                    {'symbol': symbol}
-                )
-                if success:
-                    logger.info(f"Market: Updated {symbol} price to ${price:.2f}")
-                else:
-                    logger.warning(f"Market: Failed to update price for {symbol}")
-            else:
-                logger.warning(f"Market: Instrument {symbol} not found in database")
-        except Exception as e:
-            logger.error(f"Market: Error updating {symbol} in database: {e}")
+    # Update database with fetched prices, one batch for every known instrument
+    try:
+        known = db.instruments.find_by_symbols(list(price_map), columns='symbol')
+        for symbol in price_map.keys() - known.keys():
+            logger.warning(f"Market: Instrument {symbol} not found in database")
+
+        rows = [
+            {'symbol': symbol, 'current_price': price}
+            for symbol, price in price_map.items()
+            if symbol in known
+        ]
+        db.client.bulk_update('instruments', rows, key_columns=['symbol'])
+        for row in rows:
+            logger.info(f"Market: Updated {row['symbol']} price to ${row['current_price']:.2f}")
+    except Exception as e:
+        logger.error(f"Market: Error updating prices in database: {e}")
 
     # Log symbols that didn't get prices
     missing = set(symbols_list) - set(price_map.keys())
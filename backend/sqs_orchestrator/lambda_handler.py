@@ -7,44 +7,80 @@ This Lambda function receives SQS messages and invokes the AgentCore planner age
 import json
 import logging
 import boto3
-import asyncio
 import os
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Union
+
+try:
+    import orjson
+
+    def _dumps(value: Any) -> str:
+        return orjson.dumps(value, default=str).decode()
+
+    _loads = orjson.loads
+except ImportError:
+    # orjson is optional (the function zip only bundles this file); stdlib json
+    # handles the same payloads
+    def _dumps(value: Any) -> str:
+        return json.dumps(value, default=str)
+
+    _loads = json.loads
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 # Initialize boto3 clients
 ssm = boto3.client('ssm')
+_region = os.environ.get("DEFAULT_AWS_REGION") or os.environ.get("AWS_REGION")
+bedrock_agentcore = boto3.client('bedrock-agentcore', region_name=_region) if _region else boto3.client('bedrock-agentcore')
+
+# Upper bound on concurrent planner invocations per batch; stays under the
+# client's default 10-connection pool whatever the SQS batch_size is
+MAX_CONCURRENT_INVOCATIONS = 8
+
+# Planner ARN, fetched from SSM on the first invocation and reused while the
+# container stays warm
+_planner_agent_arn = None
 
 def get_planner_agent_arn() -> str:
-    """Get the planner agent ARN from SSM Parameter Store."""
+    """Get the planner agent ARN from SSM Parameter Store (cached per container)."""
+    global _planner_agent_arn
+    if _planner_agent_arn is not None:
+        return _planner_agent_arn
     try:
         response = ssm.get_parameter(Name='/agents/planner_agent_arn')
-        return response['Parameter']['Value']
+        _planner_agent_arn = response['Parameter']['Value']
+        return _planner_agent_arn
     except Exception as e:
         logger.error(f"Failed to get planner agent ARN: {e}")
         raise
 
 
-async def invoke_agent_with_boto3(agent_runtime_arn: str, session_id: str, payload: dict) -> str:
+def job_payload(job_id: str) -> str:
+    """Planner payload for a job, with the job id doubling as the session id."""
+    job_json = _dumps(job_id)
+    return f'{{"job_id":{job_json},"session_id":{job_json}}}'
+
+
+def invoke_agent_with_boto3(agent_runtime_arn: str, session_id: str, payload: Union[dict, str]) -> str:
     """Invoke an AgentCore agent runtime with a JSON payload.
 
     Uses the bedrock-agentcore InvokeAgentRuntime API which expects:
       - agentRuntimeArn: the runtime ARN
       - payload: JSON string passed through to the agent's @app.entrypoint
-    """
-    region = os.environ.get("DEFAULT_AWS_REGION") or os.environ.get("AWS_REGION")
-    client = boto3.client('bedrock-agentcore', region_name=region) if region else boto3.client('bedrock-agentcore')
 
+    A payload that is already a JSON string is sent as-is.
+    """
     try:
-        # Always include session id for tracing if provided
-        if session_id and 'session_id' not in payload:
-            payload = {**payload, 'session_id': session_id}
+        if not isinstance(payload, str):
+            # Always include session id for tracing if provided
+            if session_id and 'session_id' not in payload:
+                payload = {**payload, 'session_id': session_id}
+            payload = _dumps(payload)
 
-        resp = client.invoke_agent_runtime(
+        resp = bedrock_agentcore.invoke_agent_runtime(
             agentRuntimeArn=agent_runtime_arn,
-            payload=json.dumps(payload)
+            payload=payload
         )
 
         # Handle StreamingBody response properly
@@ -59,18 +95,19 @@ async def invoke_agent_with_boto3(agent_runtime_arn: str, session_id: str, paylo
         if response_body:
             # Check if body is a StreamingBody (from botocore.response)
             if hasattr(response_body, 'read'):
-                # Read the streaming body
+                # Read the streaming body; agent responses can be large, so the
+                # log lines below format it lazily rather than via f-strings
                 body_content = response_body.read()
                 if isinstance(body_content, bytes):
                     body_content = body_content.decode('utf-8')
-                logger.info(f"AgentCore response body: {body_content}")
+                logger.info("AgentCore response body: %s", body_content)
                 return body_content
             elif isinstance(response_body, (bytes, bytearray)):
                 body_content = response_body.decode('utf-8')
-                logger.info(f"AgentCore response body: {body_content}")
+                logger.info("AgentCore response body: %s", body_content)
                 return body_content
             elif isinstance(response_body, str):
-                logger.info(f"AgentCore response body: {response_body}")
+                logger.info("AgentCore response body: %s", response_body)
                 return response_body
             else:
                 # Try to JSON serialize other response types
@@ -78,13 +115,80 @@ async def invoke_agent_with_boto3(agent_runtime_arn: str, session_id: str, paylo
                 return json.dumps(response_body, default=str)
         
         # If no body field, try to handle the whole response
-        logger.info(f"AgentCore response type: {type(resp)}, content: {resp}")
+        logger.info("AgentCore response type: %s, content: %s", type(resp), resp)
         return json.dumps(resp, default=str)
 
     except Exception as e:
         logger.error(f"Error invoking agent runtime {agent_runtime_arn}: {e}")
         return f"Error invoking agent: {str(e)}"
 
+def process_record(planner_arn: str, record: Dict[str, Any]):
+    """
+    Invoke the planner for one SQS record.
+    
+    Returns (succeeded, entry) where entry goes into successful_jobs or
+    failed_jobs of the handler result.
+    """
+    job_id = 'unknown'
+    try:
+        # Parse job_id from SQS message
+        message_body = record['body']
+        logger.info(f"Processing message: {message_body}")
+        
+        # Only JSON objects carry a job_id; anything else (e.g. a bare UUID) is
+        # the job id itself and skips the parse attempt
+        job_id = message_body
+        if isinstance(message_body, str) and message_body.lstrip().startswith('{'):
+            try:
+                job_id = _loads(message_body).get('job_id', message_body)
+            except json.JSONDecodeError:
+                pass
+        
+        logger.info(f"Extracted job_id: {job_id}")
+        
+        # Create payload for AgentCore
+        payload = job_payload(job_id)
+        
+        logger.info(f"Invoking planner agent for job: {job_id} with payload: {payload}")
+        
+        response = invoke_agent_with_boto3(planner_arn, job_id, payload)
+        
+        # Check if response indicates max_tokens_exceeded
+        try:
+            if isinstance(response, str):
+                response_data = _loads(response)
+                if response_data.get('max_tokens_exceeded'):
+                    logger.warning(f"Planner agent reached max tokens for job: {job_id}")
+                    logger.info(f"Max tokens response: {response_data.get('message', 'No message')}")
+                    return True, {
+                        'job_id': job_id,
+                        'status': 'max_tokens_exceeded',
+                        'message': response_data.get('message', 'Agent reached max tokens limit')
+                    }
+        except (json.JSONDecodeError, TypeError):
+            # Response is not JSON or not a dict, proceed normally
+            pass
+        
+        logger.info(f"Planner agent invoked successfully for job: {job_id}")
+        logger.info("Response: %s", response)
+        return True, job_id
+        
+    except Exception as e:
+        error_message = str(e)
+        # Check if this is a max_tokens related error
+        if 'max_tokens' in error_message.lower() or 'maxtokensreachedException' in error_message:
+            logger.warning(f"Max tokens reached for record {record.get('messageId', 'unknown')}: {e}")
+            return True, {
+                'job_id': job_id,
+                'status': 'max_tokens_exceeded', 
+                'message': f'Agent reached max tokens limit: {error_message}'
+            }
+        logger.error(f"Failed to process record {record.get('messageId', 'unknown')}: {e}")
+        return False, {
+            'messageId': record.get('messageId', 'unknown'),
+            'error': error_message
+        }
+
 def lambda_handler(event: Dict[str, Any], context) -> Dict[str, Any]:
     """
     Handle SQS messages and invoke AgentCore planner agent.
@@ -92,7 +196,9 @@ def lambda_handler(event: Dict[str, Any], context) -> Dict[str, Any]:
     Expected SQS message body: {"job_id": "uuid"}
     """
     try:
-        logger.info(f"SQS Orchestrator invoked with event: {json.dumps(event)}")
+        # Only serialize the whole event when INFO logging is actually on
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"SQS Orchestrator invoked with event: {_dumps(event)}")
         
         # Get planner agent ARN
         planner_arn = get_planner_agent_arn()
@@ -100,73 +206,19 @@ def lambda_handler(event: Dict[str, Any], context) -> Dict[str, Any]:
         
         successful_jobs = []
         failed_jobs = []
+        records = event.get('Records', [])
         
-        # Process each SQS record
-        for record in event.get('Records', []):
-            try:
-                # Parse job_id from SQS message
-                message_body = record['body']
-                logger.info(f"Processing message: {message_body}")
-                
-                # Parse JSON if needed
-                if isinstance(message_body, str):
-                    try:
-                        body_data = json.loads(message_body)
-                        job_id = body_data.get('job_id', message_body)
-                    except json.JSONDecodeError:
-                        job_id = message_body
-                else:
-                    job_id = message_body
-                
-                logger.info(f"Extracted job_id: {job_id}")
-                
-                # Create payload for AgentCore
-                payload = {
-                    "job_id": job_id
-                }
-                
-                logger.info(f"Invoking planner agent for job: {job_id} with payload: {payload}")
-                
-                # Use asyncio to call the async function
-                response = asyncio.run(invoke_agent_with_boto3(planner_arn, job_id, payload))
-                
-                # Check if response indicates max_tokens_exceeded
-                try:
-                    if isinstance(response, str):
-                        response_data = json.loads(response)
-                        if response_data.get('max_tokens_exceeded'):
-                            logger.warning(f"Planner agent reached max tokens for job: {job_id}")
-                            logger.info(f"Max tokens response: {response_data.get('message', 'No message')}")
-                            successful_jobs.append({
-                                'job_id': job_id,
-                                'status': 'max_tokens_exceeded',
-                                'message': response_data.get('message', 'Agent reached max tokens limit')
-                            })
-                            continue
-                except (json.JSONDecodeError, TypeError):
-                    # Response is not JSON or not a dict, proceed normally
-                    pass
-                
-                logger.info(f"Planner agent invoked successfully for job: {job_id}")
-                logger.info(f"Response: {response}")
-                successful_jobs.append(job_id)
-                
-            except Exception as e:
-                error_message = str(e)
-                # Check if this is a max_tokens related error
-                if 'max_tokens' in error_message.lower() or 'maxtokensreachedException' in error_message:
-                    logger.warning(f"Max tokens reached for record {record.get('messageId', 'unknown')}: {e}")
-                    successful_jobs.append({
-                        'job_id': job_id if 'job_id' in locals() else 'unknown',
-                        'status': 'max_tokens_exceeded', 
-                        'message': f'Agent reached max tokens limit: {error_message}'
-                    })
-                else:
-                    logger.error(f"Failed to process record {record.get('messageId', 'unknown')}: {e}")
-                    failed_jobs.append({
-                        'messageId': record.get('messageId', 'unknown'),
-                        'error': error_message
-                    })
+        # Invoke the planner for every record in the batch concurrently; each
+        # call is blocking network I/O, so the batch takes as long as its
+        # slowest record rather than the sum of all of them
+        if records:
+            with ThreadPoolExecutor(max_workers=min(len(records), MAX_CONCURRENT_INVOCATIONS)) as pool:
+                outcomes = list(pool.map(lambda record: process_record(planner_arn, record), records))
+        else:
+            outcomes = []
+        
+        for succeeded, entry in outcomes:
+            (successful_jobs if succeeded else failed_jobs).append(entry)
         
         # Return results
         result = {
@@ -174,7 +226,7 @@ def lambda_handler(event: Dict[str, Any], context) -> Dict[str, Any]:
             'body': json.dumps({
                 'successful_jobs': successful_jobs,
                 'failed_jobs': failed_jobs,
-                'total_processed': len(event.get('Records', [])),
+                'total_processed': len(records),
                 'success_count': len(successful_jobs),
                 'failure_count': len(failed_jobs)
             })
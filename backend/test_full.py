@@ -13,6 +13,12 @@ load_dotenv(override=True)
 from src import Database
 from src.schemas import UserCreate, InstrumentCreate, AccountCreate, PositionCreate
 
+# Job status polling backs off from the initial to the max delay (seconds),
+# and drops back to the initial delay whenever the status changes
+POLL_INITIAL_DELAY = 0.5
+POLL_MAX_DELAY = 10.0
+POLL_BACKOFF = 1.7
+
 def setup_test_data(db):
     """Ensure test user and portfolio exist"""
     print("Setting up test data...")
@@ -52,13 +58,16 @@ def setup_test_data(db):
             {'symbol': 'VTI', 'quantity': 75}
         ]
         
+        # Validate each position, then insert them all in one batch
+        holdings = []
         for pos in positions:
             position_data = PositionCreate(
                 account_id=account_id,
                 symbol=pos['symbol'],
                 quantity=pos['quantity']
             )
-            db.positions.create(position_data.model_dump())
+            holdings.append((position_data.symbol, position_data.quantity))
+        db.positions.add_positions(account_id, holdings)
         print(f"  ✓ Created {len(positions)} positions")
     else:
         print(f"  ✓ Test account exists with {len(db.positions.find_by_account(accounts[0]['id']))} positions")
@@ -97,14 +106,9 @@ def main():
     
     # Get queue URL
     QUEUE_NAME = 'alex-analysis-jobs'
-    response = sqs.list_queues(QueueNamePrefix=QUEUE_NAME)
-    queue_url = None
-    for url in response.get('QueueUrls', []):
-        if QUEUE_NAME in url:
-            queue_url = url
-            break
-    
-    if not queue_url:
+    try:
+        queue_url = sqs.get_queue_url(QueueName=QUEUE_NAME)['QueueUrl']
+    except sqs.exceptions.QueueDoesNotExist:
         print(f"  ❌ Queue {QUEUE_NAME} not found")
         return 1
     
@@ -124,20 +128,28 @@ def main():
     
     start_time = time.time()
     timeout = 180  # 3 minutes
+    deadline = time.monotonic() + timeout
+    delay = POLL_INITIAL_DELAY
     last_status = None
     
-    while time.time() - start_time < timeout:
-        job = db.jobs.find_by_id(job_id)
+    while time.monotonic() < deadline:
+        # Poll only the status columns; the full row (with its payloads) is
+        # fetched once the job reaches a terminal status
+        job = db.jobs.find_status(job_id)
         status = job['status']
         
         if status != last_status:
             elapsed = int(time.time() - start_time)
             print(f"[{elapsed:3d}s] Status: {status}")
             last_status = status
+            delay = POLL_INITIAL_DELAY
             
             if status == 'failed' and job.get('error_message'):
                 print(f"       Error: {job.get('error_message')}")
         
+        if status in ('completed', 'failed'):
+            job = db.jobs.find_by_id(job_id)
+        
         if status == 'completed':
             print("-" * 50)
             print("\n✅ Job completed successfully!")
@@ -196,7 +208,8 @@ def main():
                 print(f"Error details: {job['error_message']}")
             break
         
-        time.sleep(2)
+        time.sleep(delay)
+        delay = min(delay * POLL_BACKOFF, POLL_MAX_DELAY)
     else:
         print("-" * 50)
         print("\n❌ Job timed out after 3 minutes")
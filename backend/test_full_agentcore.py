@@ -5,6 +5,9 @@ import os
 import json
 import boto3
 import time
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from datetime import datetime, timezone, timedelta
 from dotenv import load_dotenv
 
@@ -13,54 +16,87 @@ load_dotenv(override=True)
 from src import Database
 from src.schemas import UserCreate, InstrumentCreate, AccountCreate, PositionCreate
 
+# Agent results, in display order; Jobs.find_status reports each one's
+# <name>_payload column as a has_<name> flag
+RESULT_KEYS = ('report', 'charts', 'retirement', 'summary')
+
+# Job status polling backs off from the initial to the max delay (seconds),
+# and drops back to the initial delay whenever the job shows new activity
+POLL_INITIAL_DELAY = 0.5
+POLL_MAX_DELAY = 10.0
+POLL_BACKOFF = 1.7
+
+# Log lines worth showing from each agent, matched case-insensitively
+LOG_KEYWORDS = ('error', 'fail', 'exception', 'success', 'completed')
+
+# One session and one client per service for the whole run, so credentials
+# are resolved once and connections are reused across calls
+session = boto3.Session()
+logs_client = session.client('logs', config=Config(max_pool_connections=10, retries={'max_attempts': 2}))
+sqs = session.client('sqs')
+
+QUEUE_NAME = 'alex-analysis-jobs'
+
+@lru_cache(maxsize=None)
+def get_queue_url(queue_name: str = QUEUE_NAME) -> str:
+    """Look up a queue URL by exact name (cached; raises QueueDoesNotExist)"""
+    return sqs.get_queue_url(QueueName=queue_name)['QueueUrl']
+
+# Agent log groups to check
+AGENT_LOG_GROUPS = (
+    '/aws/lambda/alex-planner',
+    '/aws/lambda/alex-tagger', 
+    '/aws/lambda/alex-reporter',
+    '/aws/lambda/alex-charter',
+    '/aws/lambda/alex-retirement'
+)
+
+def fetch_log_events(logs_client, log_group: str, start_ms: int, end_ms: int):
+    """Fetch a log group's events in a time window, returning (events, error)"""
+    try:
+        # A missing log group raises ResourceNotFoundException here, so no
+        # separate existence check is needed
+        response = logs_client.filter_log_events(
+            logGroupName=log_group,
+            startTime=start_ms,
+            endTime=end_ms
+        )
+        return response.get('events', []), None
+    except Exception as e:
+        return None, e
+
 def check_cloudwatch_logs(start_time: datetime, duration_minutes: int = 5):
     """Check CloudWatch logs for recent agent activity"""
     print(f"\n🔍 Checking CloudWatch logs (last {duration_minutes} minutes)...")
     
-    logs_client = boto3.client('logs')
-    
-    # Agent log groups to check
-    log_groups = [
-        '/aws/lambda/alex-planner',
-        '/aws/lambda/alex-tagger', 
-        '/aws/lambda/alex-reporter',
-        '/aws/lambda/alex-charter',
-        '/aws/lambda/alex-retirement'
-    ]
-    
     end_time = datetime.now(timezone.utc)
     start_time_check = start_time - timedelta(minutes=1)  # Start a bit earlier
+    start_ms = int(start_time_check.timestamp() * 1000)
+    end_ms = int(end_time.timestamp() * 1000)
     
-    for log_group in log_groups:
-        try:
-            # Check if log group exists
-            logs_client.describe_log_groups(logGroupNamePrefix=log_group)
-            
-            # Get recent log events
-            response = logs_client.filter_log_events(
-                logGroupName=log_group,
-                startTime=int(start_time_check.timestamp() * 1000),
-                endTime=int(end_time.timestamp() * 1000)
-            )
+    # Query every log group at once, then report in the usual order
+    with ThreadPoolExecutor(max_workers=len(AGENT_LOG_GROUPS)) as pool:
+        results = list(pool.map(
+            lambda log_group: fetch_log_events(logs_client, log_group, start_ms, end_ms),
+            AGENT_LOG_GROUPS
+        ))
+    
+    for log_group, (events, error) in zip(AGENT_LOG_GROUPS, results):
+        agent_name = log_group.split('-')[-1].title()
+        if error is not None:
+            print(f"  ❌ {agent_name}: Could not check logs - {error}")
+        elif events:
+            print(f"  📋 {agent_name}: {len(events)} log entries")
             
-            events = response.get('events', [])
-            if events:
-                agent_name = log_group.split('-')[-1].title()
-                print(f"  📋 {agent_name}: {len(events)} log entries")
-                
-                # Show some key log messages
-                for event in events[-3:]:  # Last 3 events
-                    message = event.get('message', '').strip()
-                    if any(keyword in message.lower() for keyword in ['error', 'fail', 'exception', 'success', 'completed']):
-                        timestamp = datetime.fromtimestamp(event['timestamp'] / 1000).strftime('%H:%M:%S')
-                        print(f"    [{timestamp}] {message}")
-            else:
-                agent_name = log_group.split('-')[-1].title()
-                print(f"  📋 {agent_name}: No recent activity")
-                
-        except Exception as e:
-            agent_name = log_group.split('-')[-1].title()
-            print(f"  ❌ {agent_name}: Could not check logs - {e}")
+            # Show some key log messages
+            for event in events[-3:]:  # Last 3 events
+                message = event.get('message', '').strip()
+                lowered = message.lower()
+                if any(keyword in lowered for keyword in LOG_KEYWORDS):
+                    timestamp = datetime.fromtimestamp(event['timestamp'] / 1000).strftime('%H:%M:%S')
+                    print(f"    [{timestamp}] {message}")
+        else:
+            print(f"  📋 {agent_name}: No recent activity")
     
     print()
 
@@ -129,7 +165,12 @@ def main():
     print(f"  - Secret ARN: {os.getenv('DATABASE_SECRET_ARN', 'Not set')[:50]}...")
     
     db = Database()
-    sqs = boto3.client('sqs')
+    
+    # Resolve the queue URL in the background while the test data and job
+    # are written to the database (the already-submitted lookup still runs)
+    pool = ThreadPoolExecutor(max_workers=1)
+    queue_url_future = pool.submit(get_queue_url)
+    pool.shutdown(wait=False)
     
     # Setup test data
     test_user_id = setup_test_data(db)
@@ -154,15 +195,9 @@ def main():
     print(f"  ✓ Created job: {job_id}")
     
     # Get queue URL
-    QUEUE_NAME = 'alex-analysis-jobs'
-    response = sqs.list_queues(QueueNamePrefix=QUEUE_NAME)
-    queue_url = None
-    for url in response.get('QueueUrls', []):
-        if QUEUE_NAME in url:
-            queue_url = url
-            break
-    
-    if not queue_url:
+    try:
+        queue_url = queue_url_future.result()
+    except sqs.exceptions.QueueDoesNotExist:
         print(f"  ❌ Queue {QUEUE_NAME} not found")
         return 1
     
@@ -183,26 +218,23 @@ def main():
     
     start_time = time.time()
     timeout = 300  # 5 minutes (increased for debugging)
+    deadline = time.monotonic() + timeout
+    delay = POLL_INITIAL_DELAY
+    next_summary = 0
     last_status = None
     last_result_keys = set()
     
     # Keep track of what we've seen
     seen_agents = set()
     
-    while time.time() - start_time < timeout:
-        job = db.jobs.find_by_id(job_id)
+    while time.monotonic() < deadline:
+        # Poll only the status columns and has_* payload flags; the full row
+        # is fetched once the job reaches a terminal status
+        job = db.jobs.find_status(job_id)
         status = job['status']
         
         # Check for new result data
-        current_result_keys = set()
-        if job.get('report_payload'):
-            current_result_keys.add('report')
-        if job.get('charts_payload'):
-            current_result_keys.add('charts')
-        if job.get('retirement_payload'):
-            current_result_keys.add('retirement')
-        if job.get('summary_payload'):
-            current_result_keys.add('summary')
+        current_result_keys = {key for key in RESULT_KEYS if job[f'has_{key}']}
         
         # Report new results
         new_results = current_result_keys - last_result_keys
@@ -210,11 +242,13 @@ def main():
             elapsed = int(time.time() - start_time)
             print(f"[{elapsed:3d}s] 📊 New results: {', '.join(new_results)}")
             last_result_keys = current_result_keys
+            delay = POLL_INITIAL_DELAY
         
         if status != last_status:
             elapsed = int(time.time() - start_time)
             print(f"[{elapsed:3d}s] 📋 Status: {status}")
             last_status = status
+            delay = POLL_INITIAL_DELAY
             
             # Debug: Print more details about job state
             if status == 'running':
@@ -226,23 +260,20 @@ def main():
                     print(f"       🔍 Details: {job.get('error_details')}")
         
         # Debug: Show what data we have so far
-        if int(time.time() - start_time) % 10 == 0:  # Every 10 seconds
-            elapsed = int(time.time() - start_time)
-            data_summary = []
-            if job.get('report_payload'):
-                data_summary.append('report')
-            if job.get('charts_payload'):
-                data_summary.append('charts')
-            if job.get('retirement_payload'):
-                data_summary.append('retirement')
-            if job.get('summary_payload'):
-                data_summary.append('summary')
+        elapsed = int(time.time() - start_time)
+        if elapsed >= next_summary:  # Every 10 seconds
+            next_summary = elapsed + 10
+            # Same payload checks as current_result_keys above, in display order
+            data_summary = [key for key in RESULT_KEYS if key in current_result_keys]
             
             if data_summary:
                 print(f"[{elapsed:3d}s] 📊 Current data: {', '.join(data_summary)}")
             else:
                 print(f"[{elapsed:3d}s] ⏳ Waiting for agent results...")
         
+        if status in ('completed', 'failed'):
+            job = db.jobs.find_by_id(job_id)
+        
         if status == 'completed':
             print("-" * 50)
             print("\n✅ Job completed successfully!")
@@ -308,7 +339,8 @@ def main():
             check_cloudwatch_logs(datetime.fromtimestamp(start_time, timezone.utc))
             break
         
-        time.sleep(2)
+        time.sleep(delay)
+        delay = min(delay * POLL_BACKOFF, POLL_MAX_DELAY)
     else:
         print("-" * 50)
         print("\n❌ Job timed out after 5 minutes")
@@ -5,7 +5,6 @@ Test that the system correctly handles users with multiple accounts.
 
 import json
 import time
-import uuid
 import boto3
 from decimal import Decimal
 
@@ -22,15 +21,18 @@ def test_multiple_accounts():
     # Initialize database
     db = Database()
     
-    # Create test user
-    test_user_id = f'test_multi_{uuid.uuid4().hex[:8]}'
-    user_id = db.users.create_user(
+    # Reuse one fixed test user across runs instead of a new one each time;
+    # its old accounts (and their positions) are cleared so every run starts clean
+    test_user_id = 'test_multi_001'
+    db.users.create_user(
         clerk_user_id=test_user_id,
         display_name='Multi Account Test User',
         years_until_retirement=25,
-        target_retirement_income=Decimal('150000')
+        target_retirement_income=Decimal('150000'),
+        if_not_exists=True
     )
-    print(f'\n✅ Created test user: {test_user_id}')
+    db.client.delete('accounts', "clerk_user_id = :user_id", {'user_id': test_user_id})
+    print(f'\n✅ Using test user: {test_user_id}')
     
     # Create multiple accounts with different portfolios
     accounts = []
@@ -170,12 +172,15 @@ def test_multiple_accounts():
         if job_status.get('report_payload'):
             report = job_status['report_payload']
             content = report.get('content', '')
-            # Check that report mentions all 3 accounts
-            accounts_mentioned = all([
-                'Taxable Brokerage' in content or 'taxable' in content.lower(),
-                'Roth IRA' in content or 'roth' in content.lower(),
-                '401(k)' in content or '401k' in content.lower()
-            ])
+            # Check that report mentions all 3 accounts (lower-casing the report
+            # once; 'Taxable Brokerage' and 'Roth IRA' are covered by the
+            # case-insensitive checks)
+            lowered = content.lower()
+            accounts_mentioned = (
+                'taxable' in lowered
+                and 'roth' in lowered
+                and ('401(k)' in content or '401k' in lowered)
+            )
             print(f'\n📝 Report:')
             print(f'  Length: {len(content)} characters')
             print(f'  All accounts analyzed: {"✅ YES" if accounts_mentioned else "❌ NO"}')
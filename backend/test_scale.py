@@ -6,16 +6,24 @@ import os
 import json
 import uuid
 import boto3
+from botocore.config import Config
 import time
 from datetime import datetime
+from typing import Dict, List
 from dotenv import load_dotenv
 import concurrent.futures
+from functools import lru_cache
 
 # Load environment variables
 load_dotenv(override=True)
 
 from src import Database
 
+# Job status polling backs off from the initial to the max delay (seconds)
+POLL_INITIAL_DELAY = 0.5
+POLL_MAX_DELAY = 10.0
+POLL_BACKOFF = 1.7
+
 async def create_test_user(user_num: int, num_accounts: int, num_positions: int):
     """Create a test user with specified number of accounts and positions"""
     db = Database()
@@ -63,13 +71,16 @@ async def create_test_user(user_num: int, num_accounts: int, num_positions: int)
         # Add positions (distribute across accounts)
         if num_positions > 0 and accounts_to_create > 0:
             positions_for_account = num_positions // accounts_to_create + (1 if acct_num <= (num_positions % accounts_to_create) else 0)
+            holdings = []
             for i in range(positions_for_account):
                 if total_positions >= num_positions:
                     break
                 symbol = instruments[total_positions % len(instruments)]
                 qty = 10.0 * (total_positions + 1)
-                db.positions.add_position(account_id, symbol, qty)
+                holdings.append((symbol, qty))
                 total_positions += 1
+            # One batch per account instead of a round trip per position
+            db.positions.add_positions(account_id, holdings)
     
     # Create job
     job_data = {
@@ -89,43 +100,64 @@ async def create_test_user(user_num: int, num_accounts: int, num_positions: int)
         "user_num": user_num
     }
 
-async def send_job_to_sqs(job_id: str):
-    """Send a job to SQS"""
-    sqs = boto3.client('sqs', region_name=os.getenv('DEFAULT_AWS_REGION', 'us-east-1'))
-    
-    # Get queue URL
-    queue_name = 'alex-analysis-jobs'
-    response = sqs.get_queue_url(QueueName=queue_name)
-    queue_url = response['QueueUrl']
-    
-    # Send message
-    message = {
-        'job_id': job_id,
-        'timestamp': datetime.now().isoformat()
-    }
+QUEUE_NAME = 'alex-analysis-jobs'
+
+# One SQS client for the whole run, so every send reuses its HTTPS connections
+sqs = boto3.client(
+    'sqs',
+    region_name=os.getenv('DEFAULT_AWS_REGION', 'us-east-1'),
+    config=Config(tcp_keepalive=True, retries={'mode': 'standard', 'max_attempts': 3}),
+)
+
+@lru_cache(maxsize=None)
+def get_queue_url(queue_name: str = QUEUE_NAME) -> str:
+    """Look up a queue URL once; it doesn't change during a test run"""
+    return sqs.get_queue_url(QueueName=queue_name)['QueueUrl']
+
+async def send_jobs_to_sqs(job_ids: List[str]) -> Dict[str, str]:
+    """Send jobs to SQS in batches of 10, returning message IDs by job ID"""
+    queue_url = get_queue_url()
+    message_ids = {}
     
-    response = sqs.send_message(
-        QueueUrl=queue_url,
-        MessageBody=json.dumps(message)
-    )
+    for start in range(0, len(job_ids), 10):
+        batch = job_ids[start:start + 10]
+        entries = [
+            {
+                'Id': str(i),
+                'MessageBody': json.dumps({
+                    'job_id': job_id,
+                    'timestamp': datetime.now().isoformat()
+                })
+            }
+            for i, job_id in enumerate(batch)
+        ]
+        response = sqs.send_message_batch(QueueUrl=queue_url, Entries=entries)
+        
+        for sent in response.get('Successful', []):
+            message_ids[batch[int(sent['Id'])]] = sent['MessageId']
+        for failed in response.get('Failed', []):
+            raise RuntimeError(f"Failed to send job {batch[int(failed['Id'])]}: {failed.get('Message', failed['Code'])}")
     
-    return response['MessageId']
+    return message_ids
 
 async def monitor_job(job_id: str, timeout: int = 300):
     """Monitor a single job until completion"""
     db = Database()
-    start_time = time.time()
+    start_time = time.monotonic()
+    delay = POLL_INITIAL_DELAY
     
-    while time.time() - start_time < timeout:
-        job = db.jobs.find_by_id(job_id)
+    while time.monotonic() - start_time < timeout:
+        job = db.jobs.find_status(job_id)
         
         if job['status'] == 'completed':
-            elapsed = int(time.time() - start_time)
-            return {"job_id": job_id, "status": "completed", "elapsed": elapsed}
+            elapsed = int(time.monotonic() - start_time)
+            # Full row (with payloads) fetched once, for the detailed results
+            return {"job_id": job_id, "status": "completed", "elapsed": elapsed, "job": db.jobs.find_by_id(job_id)}
         elif job['status'] == 'failed':
             return {"job_id": job_id, "status": "failed", "error": job.get('error_message')}
         
-        await asyncio.sleep(5)
+        await asyncio.sleep(delay)
+        delay = min(delay * POLL_BACKOFF, POLL_MAX_DELAY)
     
     return {"job_id": job_id, "status": "timeout"}
 
@@ -153,11 +185,10 @@ async def run_scale_test():
         all_users.append(user_data)
         print(f"  User {config['user_num']}: {user_data['num_accounts']} accounts, {user_data['num_positions']} positions")
     
-    # Send all jobs to SQS concurrently
+    # Send all jobs to SQS (up to 10 per request)
     print("\n🚀 Sending jobs to SQS...")
-    send_tasks = []
+    await send_jobs_to_sqs([user['job_id'] for user in all_users])
     for user in all_users:
-        msg_id = await send_job_to_sqs(user['job_id'])
         print(f"  User {user['user_num']}: Job {user['job_id'][:8]}... sent")
     
     # Monitor all jobs concurrently
@@ -206,9 +237,9 @@ async def run_scale_test():
     # Verify job details
     print("\n📊 Detailed Results:")
     db = Database()
-    for user in all_users:
-        job = db.jobs.find_by_id(user['job_id'])
-        if job['status'] == 'completed':
+    for user, result in zip(all_users, results):
+        if result['status'] == 'completed':
+            job = result['job']
             report_size = 0
             if job.get('report_payload'):
                 report_data = job['report_payload']
@@ -225,31 +256,13 @@ async def run_scale_test():
     
     # Cleanup
     print("\n🧹 Cleaning up test data...")
-    for user in all_users:
-        # Delete positions
-        for account_id in user['account_ids']:
-            db.execute_raw(
-                "DELETE FROM positions WHERE account_id = :account_id::uuid",
-                [{"name": "account_id", "value": {"stringValue": account_id}}]
-            )
-        
-        # Delete accounts
-        db.execute_raw(
-            "DELETE FROM accounts WHERE clerk_user_id = :user_id",
-            [{"name": "user_id", "value": {"stringValue": user['user_id']}}]
-        )
-        
-        # Delete jobs
-        db.execute_raw(
-            "DELETE FROM jobs WHERE clerk_user_id = :user_id",
-            [{"name": "user_id", "value": {"stringValue": user['user_id']}}]
-        )
-        
-        # Delete user
-        db.execute_raw(
-            "DELETE FROM users WHERE clerk_user_id = :user_id",
-            [{"name": "user_id", "value": {"stringValue": user['user_id']}}]
-        )
+    # Accounts, positions and jobs all cascade from users, so one DELETE
+    # removes every test user's data in a single round trip
+    placeholders = ", ".join(f":u{i}" for i in range(len(all_users)))
+    db.execute_raw(
+        f"DELETE FROM users WHERE clerk_user_id IN ({placeholders})",
+        [{"name": f"u{i}", "value": {"stringValue": user['user_id']}} for i, user in enumerate(all_users)]
+    )
     
     print("Cleanup completed")
     
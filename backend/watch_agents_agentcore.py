@@ -41,33 +41,40 @@ def get_agent_log_groups(region: str = 'us-east-1') -> Dict[str, str]:
     
     # Agent names to check
     agent_names = ['planner', 'tagger', 'reporter', 'charter', 'retirement']
+    parameter_names = {f"/agents/{agent_name}_agent_arn": agent_name for agent_name in agent_names}
+    
+    # Fetch every agent ARN in one GetParameters call (names it can't find
+    # come back in InvalidParameters rather than raising)
+    try:
+        response = ssm_client.get_parameters(Names=list(parameter_names))
+        agent_arns = {parameter_names[p['Name']]: p['Value'] for p in response['Parameters']}
+        error = "parameter not found"
+    except Exception as e:
+        agent_arns = {}
+        error = e
     
     for agent_name in agent_names:
-        try:
-            # Get agent ARN from SSM
-            parameter_name = f"/agents/{agent_name}_agent_arn"
-            response = ssm_client.get_parameter(Name=parameter_name)
-            agent_arn = response['Parameter']['Value']
-            
-            # Extract agent ID from ARN
-            # ARN format: arn:aws:bedrock:us-east-1:123456789012:agent/AGENT_ID
-            agent_id = agent_arn.split('/')[-1]
-            
-            # Construct log group name
-            log_group_name = f"/aws/bedrock-agentcore/runtimes/{agent_id}-DEFAULT"
-            
-            # Add both Lambda and AgentCore log groups
-            # log_groups[agent_name.upper()] = f"/aws/lambda/alex-{agent_name}"
-            log_groups[f"{agent_name.upper()}_AGENTCORE"] = log_group_name
-            
-            print(f"Found {agent_name} agent: {agent_id}")
-            # print(f"  Lambda logs: /aws/lambda/alex-{agent_name}")
-            print(f"  AgentCore logs: {log_group_name}")
-            
-        except Exception as e:
-            print(f"Warning: Could not get {agent_name} agent ARN from SSM: {e}")
+        agent_arn = agent_arns.get(agent_name)
+        if agent_arn is None:
+            print(f"Warning: Could not get {agent_name} agent ARN from SSM: {error}")
             # Fallback to Lambda logs only
             log_groups[agent_name.upper()] = f"/aws/lambda/alex-{agent_name}"
+            continue
+        
+        # Extract agent ID from ARN
+        # ARN format: arn:aws:bedrock:us-east-1:123456789012:agent/AGENT_ID
+        agent_id = agent_arn.split('/')[-1]
+        
+        # Construct log group name
+        log_group_name = f"/aws/bedrock-agentcore/runtimes/{agent_id}-DEFAULT"
+        
+        # Add both Lambda and AgentCore log groups
+        # log_groups[agent_name.upper()] = f"/aws/lambda/alex-{agent_name}"
+        log_groups[f"{agent_name.upper()}_AGENTCORE"] = log_group_name
+        
+        print(f"Found {agent_name} agent: {agent_id}")
+        # print(f"  Lambda logs: /aws/lambda/alex-{agent_name}")
+        print(f"  AgentCore logs: {log_group_name}")
     
     return log_groups
 
@@ -114,26 +121,20 @@ class AgentLogWatcher:
             if not response.get('logStreams'):
                 return []
 
-            # Collect events from all recent streams
-            all_events = []
-            for stream in response['logStreams']:
-                stream_name = stream['logStreamName']
-
-                # Get events from this stream
-                try:
-                    events_response = self.logs_client.filter_log_events(
-                        logGroupName=log_group,
-                        logStreamNames=[stream_name],
-                        startTime=start_time,
-                        limit=100
-                    )
-
-                    events = events_response.get('events', [])
-                    all_events.extend(events)
-
-                except Exception as e:
-                    # Stream might have been deleted or have no events
-                    continue
+            # Read new events from all recent streams in one call; start_time
+            # is just past the last event already shown, so only new ones come back
+            stream_names = [stream['logStreamName'] for stream in response['logStreams']]
+            try:
+                events_response = self.logs_client.filter_log_events(
+                    logGroupName=log_group,
+                    logStreamNames=stream_names,
+                    startTime=start_time,
+                    limit=100
+                )
+                all_events = events_response.get('events', [])
+            except Exception as e:
+                # Streams might have been deleted or have no events
+                all_events = []
 
             # Sort events by timestamp
             all_events.sort(key=lambda x: x['timestamp'])